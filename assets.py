@@ -0,0 +1,126 @@
+import hashlib
+import mmap
+import os
+import struct
+
+import pygame
+
+# Sprite name -> (source image, size it is drawn at)
+SPRITES = {
+    "plane": ("./image-removebg-preview (3).png", (70, 50)),
+    "collect": ("./image-removebg-preview (4).png", (40, 40)),
+    "avoid": ("./image-removebg-preview (6).png", (40, 40)),
+}
+
+# The atlas cache holds the already-scaled sprites packed side by side as
+# raw RGBA pixels, so later starts skip PNG decoding and scaling.
+CACHE_PATH = "./sprites.atlas"
+CACHE_MAGIC = b"PLAT"
+CACHE_VERSION = 1
+CACHE_HEADER = struct.Struct("<4sB32sHHB")  # magic, version, key, width, height, sprite count
+CACHE_ENTRY = struct.Struct("<16sHHHH")  # name, x, y, width, height
+
+
+def scaled_sprites(scale):
+    # SPRITES with the sizes the sprites are drawn at for a render scale
+    return {name: (path, (round(size[0] * scale), round(size[1] * scale)))
+            for name, (path, size) in SPRITES.items()}
+
+
+def source_key(sprites=SPRITES):
+    # Changes whenever a source image, target size or the layout changes
+    h = hashlib.sha256()
+    for name, (path, size) in sprites.items():
+        h.update(name.encode())
+        h.update(struct.pack("<HH", *size))
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.digest()
+
+
+def build_atlas(sprites=SPRITES):
+    width = sum(size[0] for _, size in sprites.values())
+    height = max(size[1] for _, size in sprites.values())
+    atlas = pygame.Surface((width, height), pygame.SRCALPHA)
+    rects = {}
+    x = 0
+    for name, (path, size) in sprites.items():
+        image = pygame.image.load(path)
+        if size == SPRITES[name][1]:
+            image = pygame.transform.scale(image, size)
+        else:
+            # Reduced-resolution sprites are filtered so they don't alias
+            image = pygame.transform.smoothscale(image.convert_alpha(), size)
+        atlas.blit(image, (x, 0))
+        rects[name] = pygame.Rect(x, 0, size[0], size[1])
+        x += size[0]
+    return atlas, rects
+
+
+def save_atlas(path, key, atlas, rects):
+    width, height = atlas.get_size()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, key, width, height, len(rects)))
+        for name, rect in rects.items():
+            f.write(CACHE_ENTRY.pack(name.encode(), rect.x, rect.y, rect.width, rect.height))
+        f.write(pygame.image.tobytes(atlas, "RGBA"))
+    os.replace(tmp_path, path)
+
+
+def load_atlas(path, key):
+    # Returns (atlas, rects) from the cache, or None if it is missing or stale
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return None
+    with f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        with data:
+            if len(data) < CACHE_HEADER.size:
+                return None
+            magic, version, cached_key, width, height, count = CACHE_HEADER.unpack_from(data)
+            if magic != CACHE_MAGIC or version != CACHE_VERSION or cached_key != key:
+                return None
+            offset = CACHE_HEADER.size
+            rects = {}
+            for _ in range(count):
+                name, x, y, w, h = CACHE_ENTRY.unpack_from(data, offset)
+                rects[name.rstrip(b"\0").decode()] = pygame.Rect(x, y, w, h)
+                offset += CACHE_ENTRY.size
+            if len(data) - offset != width * height * 4:
+                return None
+            # Pixels are read straight out of the mapping, then copied once
+            # into a surface that no longer needs the file
+            pixels = memoryview(data)[offset:]
+            try:
+                atlas = pygame.image.frombuffer(pixels, (width, height), "RGBA").copy()
+            finally:
+                pixels.release()
+    return atlas, rects
+
+
+def load_sprites(cache_path=CACHE_PATH, scale=1):
+    # Sprite surfaces by name at `scale` of their normal size, converted for
+    # the current display. Raises pygame.error or OSError if the source
+    # images can't be read. Each scale has its own cache file.
+    sprites = SPRITES
+    if scale != 1:
+        sprites = scaled_sprites(scale)
+        cache_path = f"{cache_path}.{scale:g}x"
+    key = source_key(sprites)
+    cached = load_atlas(cache_path, key)
+    if cached is None:
+        atlas, rects = build_atlas(sprites)
+        try:
+            save_atlas(cache_path, key, atlas, rects)
+        except OSError as e:
+            print(f"Could not write sprite cache: {e}")
+    else:
+        atlas, rects = cached
+
+    atlas = atlas.convert_alpha()
+    return {name: atlas.subsurface(rect) for name, rect in rects.items()}
@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+import simulation
+from simulation import (
+    PLAYING, GameState, Inputs, player_width, player_height, player_y,
+    item_size, tick_rate,
+)
+from item_store import AVOID, COLLECT
+
+# Upgrade names as used by GameState.buy_upgrade
+UPGRADES = ("speed", "tower", "eagle", "currency")
+
+
+# Bot policies: called once per tick with the game, return Inputs
+
+def idle_policy(game):
+    return Inputs()
+
+
+def seek_policy(game):
+    # Dodge eagles that are about to reach the plane, otherwise line up
+    # under the lowest tower that can still be caught
+    store = game.items
+    n = store.count
+    if n == 0:
+        return Inputs()
+    xs = store.x[:n]
+    ys = store.y[:n]
+    types = store.type[:n]
+    center = game.player_x + player_width / 2
+    half = item_size / 2
+
+    above = ys - half < player_y + player_height
+    dx = xs - center
+
+    # Eagles close enough to hit within the next few ticks
+    reach = player_width / 2 + half + game.player_speed * 2
+    threats = (types == AVOID) & above & (ys > player_y - 160) & (np.abs(dx) < reach)
+    if threats.any():
+        nearest = dx[threats][np.argmin(np.abs(dx[threats]))]
+        go_left = nearest > 0
+        if go_left and game.player_x <= 0:
+            go_left = False
+        elif not go_left and game.player_x >= simulation.WIDTH - player_width:
+            go_left = True
+        return Inputs(left=go_left, right=not go_left)
+
+    towers = (types == COLLECT) & above
+    if towers.any():
+        target = dx[towers][np.argmax(ys[towers])]
+        if target < -game.player_speed:
+            return Inputs(left=True)
+        if target > game.player_speed:
+            return Inputs(right=True)
+    return Inputs()
+
+
+POLICIES = {"idle": idle_policy, "seek": seek_policy}
+
+
+# Shop policies: called between runs, buy upgrades on the game
+
+def shop_none(game):
+    pass
+
+
+def shop_cheapest(game):
+    # Keep buying whichever affordable upgrade is cheapest
+    while True:
+        costs = {
+            "speed": game.speed_cost,
+            "tower": game.tower_cost,
+            "eagle": game.eagle_cost,
+            "currency": game.currency_boost_cost,
+        }
+        affordable = [name for name in UPGRADES if game.can_buy(name)]
+        if not affordable:
+            return
+        game.buy_upgrade(min(affordable, key=costs.get))
+
+
+def shop_in_order(order):
+    # Buy upgrades in a fixed priority order, as many as currency allows
+    def shop(game):
+        bought = True
+        while bought:
+            bought = False
+            for name in order:
+                if game.buy_upgrade(name):
+                    bought = True
+                    break
+    return shop
+
+
+def get_shop(name):
+    if name == "none":
+        return shop_none
+    if name == "cheapest":
+        return shop_cheapest
+    # Anything else is a comma separated priority list, e.g. "speed,tower"
+    order = name.split(",")
+    for upgrade in order:
+        if upgrade not in UPGRADES:
+            raise ValueError(f"unknown upgrade in shop order: {upgrade}")
+    return shop_in_order(order)
+
+
+def play_session(seed, policy="seek", shop="cheapest", max_ticks=tick_rate * 60 * 30,
+                 sample_every=tick_rate * 10):
+    # Play runs until one reaches tower_goal or the tick budget runs out,
+    # shopping between runs. Currency is sampled every `sample_every` ticks.
+    game = GameState(seed)
+    policy = POLICIES[policy]
+    shop = get_shop(shop)
+    ticks = 0
+    runs = 0
+    deaths = 0
+    curve = []
+
+    while ticks < max_ticks:
+        shop(game)
+        game.start_game()
+        runs += 1
+        while game.current_state == PLAYING and ticks < max_ticks:
+            game.step(policy(game))
+            ticks += 1
+            if ticks % sample_every == 0:
+                curve.append(game.collected_towers)
+        if game.game_won:
+            break
+        if game.game_over:
+            deaths += 1
+
+    return {
+        "seed": seed,
+        "won": game.game_won,
+        "ticks": ticks,
+        "runs": runs,
+        "deaths": deaths,
+        "upgrades": [game.speed_level, game.tower_level, game.eagle_level, game.currency_per_tower - 1],
+        "curve": curve,
+    }
+
+
+def apply_overrides(overrides):
+    # Tuning knobs are module constants in simulation, read at call time
+    for name, value in overrides.items():
+        if not hasattr(simulation, name):
+            raise ValueError(f"unknown simulation setting: {name}")
+        setattr(simulation, name, value)
+
+
+def _play(job):
+    seed, options = job
+    return play_session(seed, **options)
+
+
+def run_batch(games, seed=0, workers=None, overrides=None, **options):
+    overrides = overrides or {}
+    jobs = [(seed + i, options) for i in range(games)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        apply_overrides(overrides)
+        return [_play(job) for job in jobs]
+    chunksize = max(1, games // (workers * 8))
+    with Pool(workers, initializer=apply_overrides, initargs=(overrides,)) as pool:
+        return list(pool.imap_unordered(_play, jobs, chunksize=chunksize))
+
+
+def summarize(results):
+    won = [r for r in results if r["won"]]
+    runs = sum(r["runs"] for r in results)
+    deaths = sum(r["deaths"] for r in results)
+    win_seconds = np.array([r["ticks"] / tick_rate for r in won])
+
+    # Currency curve: games that finished early hold their last value
+    length = max((len(r["curve"]) for r in results), default=0)
+    curves = np.zeros((len(results), length))
+    for i, r in enumerate(results):
+        curve = r["curve"] or [0]
+        curves[i, :len(curve)] = curve
+        curves[i, len(curve):] = curve[-1]
+
+    summary = {
+        "games": len(results),
+        "win_rate": len(won) / len(results) if results else 0.0,
+        "death_rate": deaths / runs if runs else 0.0,
+        "runs_per_game": runs / len(results) if results else 0.0,
+        "currency_curve": curves.mean(axis=0).round(2).tolist() if length else [],
+    }
+    if len(win_seconds):
+        summary["time_to_goal_s"] = {
+            "mean": float(win_seconds.mean()),
+            "p50": float(np.percentile(win_seconds, 50)),
+            "p90": float(np.percentile(win_seconds, 90)),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo balance runs for the plane game")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--policy", choices=POLICIES, default="seek")
+    parser.add_argument("--shop", default="cheapest",
+                        help="none, cheapest, or a priority list like speed,tower,eagle,currency")
+    parser.add_argument("--minutes", type=float, default=30, help="gameplay budget per game")
+    parser.add_argument("--tower-chance", type=float)
+    parser.add_argument("--tower-chance-per-level", type=float)
+    parser.add_argument("--eagle-reduction-per-level", type=float)
+    parser.add_argument("--cost-multiplier", type=float)
+    parser.add_argument("--out", help="write the summary as JSON")
+    args = parser.parse_args()
+
+    overrides = {}
+    if args.tower_chance is not None:
+        overrides["tower_chance"] = args.tower_chance
+    if args.tower_chance_per_level is not None:
+        overrides["tower_chance_per_level"] = args.tower_chance_per_level
+    if args.eagle_reduction_per_level is not None:
+        overrides["eagle_reduction_per_level"] = args.eagle_reduction_per_level
+    if args.cost_multiplier is not None:
+        overrides["upgrade_cost_multiplier"] = args.cost_multiplier
+
+    start = time.perf_counter()
+    results = run_batch(args.games, seed=args.seed, workers=args.workers, overrides=overrides,
+                        policy=args.policy, shop=args.shop,
+                        max_ticks=int(args.minutes * 60 * tick_rate))
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(results)
+    summary["settings"] = overrides
+    summary["elapsed_s"] = elapsed
+    print(json.dumps(summary, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
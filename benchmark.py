@@ -0,0 +1,206 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import simulation
+from simulation import (
+    GAME_OVER, MENU, PLAYING, UPGRADES, HEIGHT, WIDTH, Inputs, max_upgrade_level,
+)
+
+
+# Scenarios are run inside main.py (--scenario NAME) so they exercise the
+# real loop: simulation, every draw function and the display update.
+
+class Scenario:
+    # Base scenario: gameplay that never ends, sweeping left and right
+    state = PLAYING
+
+    def setup(self, game):
+        if self.state == PLAYING:
+            game.start_game()
+        else:
+            game.current_state = self.state
+
+    def inputs(self, frame):
+        return Inputs(left=(frame // 60) % 2 == 0, right=(frame // 60) % 2 == 1)
+
+    def after_step(self, game):
+        # Collisions would end the run, so keep playing through them
+        if game.current_state == GAME_OVER:
+            game.game_over = False
+            game.game_won = False
+            game.current_state = PLAYING
+
+
+class ItemsScenario(Scenario):
+    # Keep a fixed number of live items spread over the screen
+    def __init__(self, count=10000):
+        self.count = count
+
+    def setup(self, game):
+        super().setup(game)
+        rng = np.random.default_rng(0)
+        ys = np.sort(rng.uniform(0, HEIGHT, self.count))[::-1]
+        xs = rng.integers(20, WIDTH - 20, self.count, endpoint=True)
+        types = rng.integers(0, 2, self.count)
+        for x, y, item_type in zip(xs.tolist(), ys.tolist(), types.tolist()):
+            game.items.append(x, y, item_type)
+
+    def after_step(self, game):
+        super().after_step(game)
+        missing = self.count - len(game.items)
+        for _ in range(missing):
+            game.items.append(game.spawns.next()[1], 0, 1)
+
+
+class SpawnEveryFrameScenario(Scenario):
+    def setup(self, game):
+        simulation.spawn_rate = 1
+        super().setup(game)
+
+
+class MaxedUpgradesScenario(Scenario):
+    def setup(self, game):
+        game.collected_towers = 10 ** 6
+        for upgrade_type in ("speed", "tower", "eagle", "currency"):
+            for _ in range(max_upgrade_level):
+                game.buy_upgrade(upgrade_type)
+        super().setup(game)
+
+
+class IdleScenario(Scenario):
+    def __init__(self, state):
+        self.state = state
+
+    def inputs(self, frame):
+        return Inputs()
+
+
+SCENARIOS = {
+    "items_10k": lambda: ItemsScenario(10000),
+    "spawn_every_frame": SpawnEveryFrameScenario,
+    "upgrades_maxed": MaxedUpgradesScenario,
+    "menu_idle": lambda: IdleScenario(MENU),
+    "upgrades_idle": lambda: IdleScenario(UPGRADES),
+}
+
+
+class ScenarioRun:
+    # Collects frame times for one scenario inside main.py
+    def __init__(self, name, frames):
+        self.name = name
+        self.scenario = SCENARIOS[name]()
+        self.frames = frames
+        self.frame_times = []
+        self.start = None
+
+    def record(self, frame_seconds):
+        if self.start is None:
+            self.start = time.perf_counter()
+        self.frame_times.append(frame_seconds)
+        return len(self.frame_times) < self.frames
+
+    def report(self, game):
+        elapsed = time.perf_counter() - self.start
+        times = np.array(self.frame_times) * 1000
+        ticks = game.tick if self.scenario.state == PLAYING else len(times)
+        return {
+            "scenario": self.name,
+            "frames": len(times),
+            "ticks_per_sec": ticks / elapsed,
+            "frame_ms_mean": float(times.mean()),
+            "frame_ms_p99": float(np.percentile(times, 99)),
+            "frame_ms_max": float(times.max()),
+            # ru_maxrss is in kilobytes on Linux
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+
+
+# Metrics checked against the baseline, and whether higher is better
+CHECKS = {
+    "ticks_per_sec": True,
+    "frame_ms_mean": False,
+    "frame_ms_p99": False,
+    "peak_rss_mb": False,
+}
+
+
+def run_scenario(name, frames, extra_args):
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy")
+    result = subprocess.run(
+        [sys.executable, "main.py", "--scenario", name, "--frames", str(frames)] + extra_args,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(result, baseline, threshold):
+    # Descriptions of every metric that got worse by more than threshold
+    failures = []
+    for metric, higher_is_better in CHECKS.items():
+        old = baseline.get(metric)
+        new = result[metric]
+        if not old:
+            continue
+        change = (new - old) / old
+        if higher_is_better:
+            change = -change
+        if change > threshold:
+            failures.append(f"{result['scenario']}: {metric} {old:.3f} -> {new:.3f} ({change:+.0%} worse)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless stress benchmarks with regression checks")
+    parser.add_argument("scenarios", nargs="*", help=f"default: all of {', '.join(SCENARIOS)}")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--baseline", default="bench_baseline.json")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="write these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed fractional regression per metric")
+    args, extra_args = parser.parse_known_args()
+
+    names = args.scenarios or list(SCENARIOS)
+    results = {}
+    for name in names:
+        results[name] = run_scenario(name, args.frames, extra_args)
+        r = results[name]
+        print(f"{name:<20} {r['ticks_per_sec']:>10.0f} ticks/s  mean {r['frame_ms_mean']:.3f} ms  "
+              f"p99 {r['frame_ms_p99']:.3f} ms  peak {r['peak_rss_mb']:.1f} MB")
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    failures = []
+    for name, result in results.items():
+        if name in baseline:
+            failures += compare(result, baseline[name], args.threshold)
+    for failure in failures:
+        print("REGRESSION", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
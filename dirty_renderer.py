@@ -0,0 +1,145 @@
+import math
+
+import pygame
+
+# Past this many rects in a frame, one background blit and one full-screen
+# update are cheaper than restoring and pushing every rect on its own
+FULL_REDRAW_RECTS = 150
+
+
+class DirtyRenderer:
+    # Optional renderer that only pushes changed regions to the display.
+    #
+    # Each screen has a pre-composited background. Moving content (items,
+    # the player) is registered as sprites and erased by restoring the
+    # background under last frame's rects. Widgets (buttons, counters) are
+    # keyed by a value and only redrawn when that value, or a widget they
+    # overlap, changes.
+    #
+    # When drawing to a smaller offscreen surface, `output` is the window
+    # surface and only the dirty regions are scaled up into it.
+    #
+    # Frames with more than `max_rects` sprites or dirty rects (thousands
+    # of items) fall back to redrawing and pushing the whole screen.
+    def __init__(self, screen, output=None, max_rects=FULL_REDRAW_RECTS):
+        self.screen = screen
+        self.output = output
+        self.max_rects = max_rects
+        self.full = False
+        self.background = None
+        self.sprite_rects = []
+        self.erased = []
+        self.widgets = {}
+        self.pending = []
+        self.flushed = True
+        self.dirty = []
+
+    def begin(self, background):
+        self.flushed = False
+        if background is not self.background:
+            # New screen: put the whole background up and forget widgets
+            self.background = background
+            self.screen.blit(background, (0, 0))
+            self.dirty = [self.screen.get_rect()]
+            self.sprite_rects = []
+            self.widgets = {}
+            return
+
+        # Same screen: erase last frame's sprites, all at once when there
+        # are many. That wipes every widget, so they all count as erased.
+        if len(self.sprite_rects) > self.max_rects:
+            self.screen.blit(self.background, (0, 0))
+            self.full = True
+            self.erased = [self.screen.get_rect()]
+        else:
+            for rect in self.sprite_rects:
+                self.restore(rect)
+            self.erased = self.sprite_rects
+        self.sprite_rects = []
+
+    def restore(self, rect):
+        self.screen.blit(self.background, rect, rect)
+        self.dirty.append(rect)
+
+    def sprite(self, rect):
+        # Content that is redrawn every frame and erased on the next one
+        rect = pygame.Rect(rect)
+        self.sprite_rects.append(rect)
+        self.dirty.append(rect)
+
+    def sprites(self, rects):
+        # Rects from Surface.blits() are already pygame.Rects
+        self.sprite_rects.extend(rects)
+        self.dirty.extend(rects)
+
+    def widget(self, key, value, rect, draw):
+        # Widgets are collected during the frame and drawn in present(), so
+        # overlapping ones can be redrawn together in their original order
+        self.pending.append((key, value, pygame.Rect(rect), draw))
+
+    def flush_widgets(self):
+        # Runs once per frame, after all widgets for the frame are in
+        if self.flushed:
+            return
+        self.flushed = True
+        areas = []
+        redraw = set()
+        for i, (key, value, rect, draw) in enumerate(self.pending):
+            old = self.widgets.get(key)
+            if old is None or old[0] != value:
+                redraw.add(i)
+                areas.append(rect)
+                if old is not None:
+                    areas.append(old[1])
+
+        # Widgets that weren't drawn this frame leave their area behind
+        drawn = {key for key, _, _, _ in self.pending}
+        for key in list(self.widgets):
+            if key not in drawn:
+                areas.append(self.widgets.pop(key)[1])
+
+        # Restoring the background under one widget (or an erased sprite)
+        # wipes any widget it overlaps, so those redraw too
+        grown = True
+        while grown:
+            grown = False
+            for i, (_, _, rect, _) in enumerate(self.pending):
+                if i in redraw:
+                    continue
+                if rect.collidelist(areas) != -1 or rect.collidelist(self.erased) != -1:
+                    redraw.add(i)
+                    areas.append(rect)
+                    grown = True
+
+        for area in areas:
+            self.restore(area)
+        for i in sorted(redraw):
+            key, value, rect, draw = self.pending[i]
+            draw()
+            self.widgets[key] = (value, rect)
+        self.pending = []
+        self.erased = []
+
+    def upscale(self, rect):
+        # Scale one region of the screen into output; returns the output rect
+        rect = rect.clip(self.screen.get_rect())
+        if not rect.width or not rect.height:
+            return None
+        sx = self.output.get_width() / self.screen.get_width()
+        sy = self.output.get_height() / self.screen.get_height()
+        left, top = math.floor(rect.x * sx), math.floor(rect.y * sy)
+        target = pygame.Rect(left, top, math.ceil(rect.right * sx) - left, math.ceil(rect.bottom * sy) - top)
+        pygame.transform.scale(self.screen.subsurface(rect), target.size, self.output.subsurface(target))
+        return target
+
+    def present(self):
+        self.flush_widgets()
+        dirty = self.dirty
+        if self.full or len(dirty) > self.max_rects:
+            dirty = [self.screen.get_rect()]
+            self.full = False
+        if self.output and dirty:
+            dirty = [target for target in map(self.upscale, dirty) if target]
+        if dirty:
+            pygame.display.update(dirty)
+        self.dirty = []
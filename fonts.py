@@ -0,0 +1,57 @@
+import json
+import os
+
+import pygame
+
+# Resolved system font paths, kept across runs so the slow font directory
+# scan behind pygame.font.match_font only happens once per machine
+CACHE_PATH = "./font_paths.json"
+
+_paths = None
+
+
+def _load_paths():
+    global _paths
+    if _paths is None:
+        try:
+            with open(CACHE_PATH) as f:
+                _paths = json.load(f)
+        except (OSError, ValueError):
+            _paths = {}
+    return _paths
+
+
+def resolve(name):
+    # File for a system font name, or None for pygame's default font
+    if name is None:
+        return None
+    paths = _load_paths()
+    if name in paths and (paths[name] is None or os.path.exists(paths[name])):
+        return paths[name]
+    path = pygame.font.match_font(name)
+    paths[name] = path
+    try:
+        with open(CACHE_PATH, "w") as f:
+            json.dump(paths, f)
+    except OSError:
+        pass
+    return path
+
+
+class LazyFont:
+    # Stands in for pygame.font.SysFont(name, size). The font module is
+    # started and the font file opened the first time the font is used.
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self._font = None
+
+    def get(self):
+        if self._font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self._font = pygame.font.Font(resolve(self.name), self.size)
+        return self._font
+
+    def render(self, text, antialias, color):
+        return self.get().render(text, antialias, color)
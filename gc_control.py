@@ -0,0 +1,134 @@
+import gc
+import json
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+
+# Generation 2 threshold while playing: high enough that a full collection
+# never starts on its own during a run
+DEFERRED_THRESHOLD = 1 << 30
+
+
+class GCControl:
+    # Keeps garbage collection pauses out of gameplay. With `freeze` on,
+    # everything allocated during startup is moved out of the collector's
+    # sight with gc.freeze(), and full (generation 2) collections are put off
+    # while playing and run at the next menu transition instead. Young
+    # collections still run as usual; they only look at recent objects.
+    #
+    # When given a profiler, every collection is timed as a "gc0"/"gc1"/"gc2"
+    # phase, so pauses show up in the F3 overlay and the profile export. The
+    # collections run here on purpose are timed as "gc_deferred". The phases
+    # are created up front: the callback can fire in the middle of anything,
+    # including the profiler walking its own phases.
+    def __init__(self, freeze=False, profiler=None):
+        self.freeze = freeze
+        self.profiler = profiler
+        self.playing = False
+        self.thresholds = gc.get_threshold()
+        self._timer = None
+        self._deferred = False
+        if profiler is not None:
+            self._timers = [profiler.phase(f"gc{generation}") for generation in range(3)]
+            self._deferred_timer = profiler.phase("gc_deferred")
+            gc.callbacks.append(self._on_collect)
+
+    def _on_collect(self, phase, info):
+        if phase == "start":
+            self._timer = self._deferred_timer if self._deferred else self._timers[info["generation"]]
+            self._timer.__enter__()
+        elif self._timer is not None:
+            self._timer.__exit__(None, None, None)
+            self._timer = None
+
+    def collect(self):
+        self._deferred = True
+        try:
+            gc.collect()
+        finally:
+            self._deferred = False
+
+    def startup_done(self):
+        if self.freeze:
+            self.collect()
+            gc.freeze()
+
+    def update(self, playing):
+        # Call once per frame with whether gameplay is running
+        if not self.freeze or playing == self.playing:
+            return
+        self.playing = playing
+        if playing:
+            gc.set_threshold(self.thresholds[0], self.thresholds[1], DEFERRED_THRESHOLD)
+        else:
+            gc.set_threshold(*self.thresholds)
+            self.collect()
+
+    def close(self):
+        if self.profiler is not None:
+            gc.callbacks.remove(self._on_collect)
+        gc.set_threshold(*self.thresholds)
+
+
+class AllocationProbe:
+    # Opt-in tracemalloc probe. For every frame it records how far traced
+    # memory rose above where the frame started (the frame's transient
+    # allocations) and the net change when it ended. report() adds the
+    # source lines that allocated the most since the probe started.
+    # tracemalloc slows everything down, so only frame-to-frame comparisons
+    # are meaningful, not absolute frame times.
+    def __init__(self, window=600, frames=25):
+        self.frames = frames
+        self.peaks = deque(maxlen=window)
+        self.growth = deque(maxlen=window)
+        tracemalloc.start(frames)
+        self.baseline = tracemalloc.take_snapshot()
+        self.started = time.time()
+        self.frame_start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+    def end_frame(self):
+        current, peak = tracemalloc.get_traced_memory()
+        self.peaks.append(peak - self.frame_start)
+        self.growth.append(current - self.frame_start)
+        self.frame_start = current
+        tracemalloc.reset_peak()
+
+    def top_sites(self, limit=10):
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ])
+        rows = []
+        for stat in snapshot.compare_to(self.baseline, "lineno")[:limit]:
+            frame = stat.traceback[0]
+            rows.append({
+                "site": f"{frame.filename}:{frame.lineno}",
+                "size_diff_kb": stat.size_diff / 1024,
+                "count_diff": stat.count_diff,
+            })
+        return rows
+
+    def report(self, limit=10):
+        peaks = np.array(self.peaks, dtype=np.float64) / 1024
+        growth = np.array(self.growth, dtype=np.float64) / 1024
+        report = {"frames": len(peaks), "top_sites": self.top_sites(limit)}
+        if len(peaks):
+            report["frame_alloc_kb"] = {
+                "mean": float(peaks.mean()),
+                "p99": float(np.percentile(peaks, 99)),
+                "max": float(peaks.max()),
+            }
+            report["frame_growth_kb"] = {
+                "mean": float(growth.mean()),
+                "max": float(growth.max()),
+            }
+        return report
+
+    def export(self, path, limit=10):
+        with open(path, "w") as f:
+            json.dump(self.report(limit), f, indent=2)
+
+    def close(self):
+        tracemalloc.stop()
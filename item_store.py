@@ -0,0 +1,127 @@
+import bisect
+import operator
+
+import numpy as np
+
+# Item types stored in the type column
+COLLECT = 0
+AVOID = 1
+
+TYPE_NAMES = ("collect", "avoid")
+
+
+class ItemStore:
+    # Structure-of-arrays storage for falling items. Only the first `count`
+    # rows are live; removal compacts the columns with a boolean mask so
+    # movement, culling and collision tests run as single NumPy operations.
+    #
+    # Items spawn at the top and all fall at the same speed, so rows stay
+    # sorted by y, largest (oldest) first. While that holds, off-screen
+    # culling drops a prefix and collision tests only look at the rows in
+    # the target's vertical band, found by binary search.
+    def __init__(self, capacity=256):
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.type = np.zeros(capacity, dtype=np.int8)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.count = 0
+        self.sorted = True
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self, capacity):
+        for name in ("x", "y", "type", "alive"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def append(self, x, y, item_type):
+        if self.count == len(self.x):
+            self._grow(len(self.x) * 2)
+        i = self.count
+        if i and y > self.y[i - 1]:
+            self.sorted = False
+        self.x[i] = x
+        self.y[i] = y
+        self.type[i] = item_type
+        self.alive[i] = True
+        self.count += 1
+
+    def clear(self):
+        self.alive[:self.count] = False
+        self.count = 0
+        self.sorted = True
+
+    def compact(self):
+        # Drop every row whose alive flag was cleared, keeping order
+        n = self.count
+        keep = self.alive[:n]
+        live = int(np.count_nonzero(keep))
+        if live == n:
+            return
+        for column in (self.x, self.y, self.type):
+            column[:live] = column[:n][keep]
+        self.alive[:live] = True
+        self.alive[live:n] = False
+        self.count = live
+
+    def drop_front(self, k):
+        # Remove the first k rows
+        n = self.count
+        for column in (self.x, self.y, self.type):
+            column[:n - k] = column[k:n]
+        self.alive[n - k:n] = False
+        self.count = n - k
+
+    def band(self, low, high):
+        # Index range [start, stop) of rows with low < y < high. Rows are
+        # sorted by descending y, so binary search on -y.
+        n = self.count
+        start = bisect.bisect_right(self.y, -high, 0, n, key=operator.neg)
+        stop = bisect.bisect_left(self.y, -low, start, n, key=operator.neg)
+        return start, stop
+
+    def move(self, dy, limit):
+        # Move every item down by dy and drop the ones past `limit`
+        n = self.count
+        y = self.y[:n]
+        y += dy
+        if self.sorted:
+            # Everything past the limit sits at the front
+            _, past = self.band(limit, np.inf)
+            if past:
+                self.drop_front(past)
+            return
+        np.less_equal(y, limit, out=self.alive[:n])
+        self.compact()
+
+    def collide_rect(self, left, top, width, height, size):
+        # Indices of items whose size x size box (centred on x, y) overlaps
+        # the given rect. Touching edges don't count, matching pygame.Rect.
+        half = size // 2
+        if self.sorted:
+            # Broad phase: only rows whose y puts them level with the rect
+            start, stop = self.band(top - size + half, top + height + half)
+        else:
+            start, stop = 0, self.count
+        if start >= stop:
+            return np.empty(0, dtype=np.intp)
+        if stop - start <= 8:
+            # A handful of candidates is cheaper to test without NumPy
+            hits = []
+            for i, x, y in zip(range(start, stop), self.x[start:stop].tolist(), self.y[start:stop].tolist()):
+                ix = x - half
+                iy = y - half
+                if ix < left + width and ix + size > left and iy < top + height and iy + size > top:
+                    hits.append(i)
+            return np.array(hits, dtype=np.intp)
+        ix = self.x[start:stop] - half
+        iy = self.y[start:stop] - half
+        hit = (ix < left + width) & (ix + size > left) & (iy < top + height) & (iy + size > top)
+        return np.flatnonzero(hit) + start
+
+    def remove(self, indices):
+        self.alive[indices] = False
+        self.compact()
@@ -0,0 +1,352 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+import urllib.parse
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import telemetry
+from simulation import tick_rate
+
+# Finished runs are posted to a leaderboard as {"scores": [...]} batches.
+# Scores that can't be delivered wait in QUEUE_PATH, one JSON object per
+# line, and are retried later in this session or the next one.
+QUEUE_PATH = "./leaderboard_queue.jsonl"
+
+
+def run_result(game):
+    # The score for the run that just ended. run_id lets the server drop a
+    # batch it already stored when a retry delivers it twice.
+    return {
+        "run_id": uuid.uuid4().hex,
+        "outcome": "won" if game.game_won else "lost",
+        "towers": game.run_towers,
+        "duration": (game.tick - game.run_start_tick) / tick_rate,
+        "levels": {
+            "speed": game.speed_level,
+            "tower": game.tower_level,
+            "eagle": game.eagle_level,
+            "currency": game.currency_per_tower - 1,
+        },
+        "seed": game.seed,
+        "finished_at": time.time(),
+    }
+
+
+class OfflineQueue:
+    # Unsent scores on disk. The whole queue is rewritten on every save, the
+    # same way player_profile saves: temporary file, fsync, rename.
+    def __init__(self, path=QUEUE_PATH):
+        self.path = path
+        self.stored = False
+
+    def load(self):
+        records = []
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        telemetry.logger.log(telemetry.WARNING, "leaderboard_queue_corrupt", path=self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            telemetry.logger.log(telemetry.WARNING, "leaderboard_queue_unreadable", path=self.path, error=str(e))
+        self.stored = bool(records)
+        return records
+
+    def save(self, records):
+        if not records and not self.stored:
+            return
+        try:
+            if records:
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w") as f:
+                    f.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            else:
+                os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            telemetry.logger.log(telemetry.WARNING, "leaderboard_queue_save_failed", path=self.path, error=str(e))
+            return
+        self.stored = bool(records)
+
+
+class HttpConnection:
+    # Just enough HTTP/1.1 over asyncio streams to POST JSON and read the
+    # status. The connection is kept open between requests and reopened
+    # when the server has closed it.
+    def __init__(self, url, timeout=5.0):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported leaderboard URL: {url}")
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = parts.scheme == "https"
+        self.netloc = parts.netloc
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def post_json(self, payload):
+        # Returns the response status and headers. A request on a reused
+        # connection that fails is retried once on a fresh one.
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        while True:
+            fresh = self.writer is None
+            if fresh:
+                self.reader, self.writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port, ssl=self.ssl), self.timeout)
+            try:
+                return await asyncio.wait_for(self._request(body), self.timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                self.close()
+                if fresh:
+                    raise
+
+    async def _request(self, body):
+        head = (
+            f"POST {self.path} HTTP/1.1\r\n"
+            f"Host: {self.netloc}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n"
+        )
+        self.writer.write(head.encode("latin-1") + body)
+        await self.writer.drain()
+
+        reader = self.reader
+        while True:
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionError("connection closed by server")
+            version, status = status_line.decode("latin-1").split()[:2]
+            status = int(status)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            # Interim 1xx responses come before the real one
+            if status >= 200:
+                break
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+
+        # The body is never used, but it has to be read to reuse the
+        # connection. 204 and 304 never have one. Without a length or
+        # chunked encoding, the body runs until the server closes the
+        # connection; a server that keeps it open anyway is taken to have
+        # sent no body, and the connection is not reused.
+        if status in (204, 304):
+            pass
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    # Skip any trailers up to the closing blank line
+                    while await reader.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                await reader.readexactly(size + 2)
+        elif "content-length" in headers:
+            await reader.readexactly(int(headers["content-length"]))
+        elif not keep_alive:
+            await reader.read()
+        else:
+            keep_alive = False
+        if not keep_alive:
+            self.close()
+        return status, headers
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = None
+        self.writer = None
+
+
+class LeaderboardClient:
+    # Sends scores from a background thread running its own asyncio loop,
+    # so the game loop never waits on the network. submit() only hands the
+    # score to that loop. Scores arriving close together go out in one
+    # POST of up to `batch_size`. While the server can't be reached, unsent
+    # scores are kept in the offline queue and retried with a growing
+    # delay; anything still unsent at close() is left there for next time.
+    def __init__(self, url, queue_path=QUEUE_PATH, batch_size=20, batch_interval=0.5,
+                 timeout=5.0, retry_delay=2.0, max_retry_delay=60.0, max_queued=1000):
+        self.connection = HttpConnection(url, timeout)
+        self.queue = OfflineQueue(queue_path)
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.max_queued = max_queued
+        self.pending = []
+        self.incoming = []
+        self.sent = 0
+        self.loop = asyncio.new_event_loop()
+        self._arrived = asyncio.Event()
+        self._task = self.loop.create_task(self._run())
+        self._thread = threading.Thread(target=self._serve, name="leaderboard", daemon=True)
+        self._thread.start()
+
+    def submit(self, score):
+        self.loop.call_soon_threadsafe(self._receive, score)
+
+    def _receive(self, score):
+        self.incoming.append(score)
+        self._arrived.set()
+
+    def _take_incoming(self):
+        self.pending.extend(self.incoming)
+        self.incoming.clear()
+        self._arrived.clear()
+        if len(self.pending) > self.max_queued:
+            dropped = len(self.pending) - self.max_queued
+            del self.pending[:dropped]
+            telemetry.logger.log(telemetry.WARNING, "leaderboard_queue_full", dropped=dropped)
+
+    def _serve(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.loop.close()
+
+    async def _run(self):
+        self.pending = self.queue.load()
+        delay = self.retry_delay
+        try:
+            while True:
+                if not self.pending and not self.incoming:
+                    await self._arrived.wait()
+                # Let the rest of a burst arrive so it shares the request
+                await asyncio.sleep(self.batch_interval)
+                self._take_incoming()
+
+                batch = self.pending[:self.batch_size]
+                try:
+                    status, headers = await self.connection.post_json({"scores": batch})
+                    error = None
+                    if 300 <= status < 400:
+                        # Nothing was stored; the URL needs fixing, so keep
+                        # the scores until it is
+                        error = f"HTTP {status} redirect to {headers.get('location', '?')}"
+                    elif status >= 500 or status == 429:
+                        error = f"HTTP {status}"
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+                    error = str(e) or type(e).__name__
+                if error:
+                    self._take_incoming()
+                    self.queue.save(self.pending)
+                    telemetry.logger.log(telemetry.WARNING, "leaderboard_offline", error=error,
+                                         queued=len(self.pending), retry_in=delay)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.max_retry_delay)
+                    continue
+
+                # A 4xx won't get better on retry, so those scores are
+                # dropped; only a 2xx means they were stored
+                if status >= 400:
+                    telemetry.logger.log(telemetry.WARNING, "leaderboard_rejected", status=status, count=len(batch))
+                else:
+                    self.sent += len(batch)
+                    telemetry.logger.log(telemetry.INFO, "leaderboard_sent", count=len(batch))
+                del self.pending[:len(batch)]
+                delay = self.retry_delay
+                self.queue.save(self.pending)
+        finally:
+            self._take_incoming()
+            self.queue.save(self.pending)
+            self.connection.close()
+
+    def close(self, timeout=1.0):
+        # Stop without waiting on a request in flight; its scores are still
+        # pending and get saved with the rest
+        if self._thread.is_alive():
+            self.loop.call_soon_threadsafe(self._task.cancel)
+            self._thread.join(timeout)
+
+
+class StubServer(ThreadingHTTPServer):
+    # Local leaderboard for trying the client out. Scores are kept in memory
+    # by run_id, and every accepted POST is logged as (client address,
+    # batch size).
+    def __init__(self, address, handler=None):
+        super().__init__(address, handler or StubHandler)
+        self.scores = {}
+        self.posts = []
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/scores"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            batch = json.loads(self.rfile.read(length))["scores"]
+        except (ValueError, KeyError, TypeError):
+            self._reply(400, {"error": "expected {\"scores\": [...]}"})
+            return
+        scores = self.server.scores
+        for score in batch:
+            scores[score.get("run_id")] = score
+        self.server.posts.append((self.client_address, len(batch)))
+        print(f"received {len(batch)} scores ({len(scores)} total)")
+        self._reply(200, {"stored": len(batch)})
+
+    def do_GET(self):
+        ranked = sorted(self.server.scores.values(), key=lambda score: score.get("duration", 0))
+        self._reply(200, {"scores": ranked})
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub leaderboard server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = StubServer((args.host, args.port))
+    print(f"leaderboard stub on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+
+if __name__ == "__main__":
+    main()
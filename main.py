@@ -1,15 +1,79 @@
+import time
+startup_start = time.perf_counter()
+
+import argparse
 import pygame
 import sys
-import random
 import os
-import time
-
-# Initialize pygame
-pygame.init()
-
-# Screen dimensions
-WIDTH = 800
-HEIGHT = 600
+import random
+import json
+
+from simulation import (
+    WIDTH, HEIGHT, MENU, PLAYING, GAME_OVER, UPGRADES,
+    player_width, player_height, player_y, item_size, max_upgrade_level,
+    tower_chance, tower_chance_per_level, eagle_reduction_per_level, tower_goal, GameState, Inputs, FixedTimestep,
+    tick_time,
+)
+from item_store import COLLECT, AVOID
+from text_cache import render_text
+from dirty_renderer import DirtyRenderer
+import telemetry
+from profiler import FrameProfiler
+from replay import Recorder
+import assets
+from fonts import LazyFont
+from gc_control import GCControl, AllocationProbe
+from widgets import Button, Hotspot, dispatch_click
+import player_profile
+import leaderboard
+
+parser = argparse.ArgumentParser(description="Plane Collection Game")
+parser.add_argument("--dirty-rects", action="store_true",
+                    help="only redraw and push changed screen regions")
+parser.add_argument("--log-level", choices=telemetry.LEVELS, default="off",
+                    help="record game events at or above this level")
+parser.add_argument("--log-file", default="telemetry.jsonl",
+                    help="JSONL file events are flushed to")
+parser.add_argument("--fps", type=int, default=60,
+                    help="render frame cap; the simulation always runs at its own tick rate")
+parser.add_argument("--uncapped", action="store_true",
+                    help="render as fast as possible")
+parser.add_argument("--profile-out", metavar="PATH",
+                    help="write per-phase frame timings to PATH (.csv or .json) on exit")
+parser.add_argument("--gc-freeze", action="store_true",
+                    help="freeze startup objects and hold full GC collections until the menu")
+parser.add_argument("--trace-alloc", metavar="PATH",
+                    help="track per-frame allocations with tracemalloc and write a JSON report to PATH")
+parser.add_argument("--seed", type=int,
+                    help="seed for this session (random if not given)")
+parser.add_argument("--record", metavar="PATH",
+                    help="save this session's inputs to PATH for replay.py")
+parser.add_argument("--render-scale", type=float, default=1.0,
+                    help="draw at this fraction of the window resolution, e.g. 0.5")
+parser.add_argument("--scale-mode", choices=("sdl", "software"), default="sdl",
+                    help="with --render-scale: let SDL scale the window (pygame.SCALED) "
+                         "or upscale the frame into an 800x600 window ourselves")
+parser.add_argument("--save-file", default=player_profile.PATH,
+                    help="profile that currency and upgrades are loaded from and saved to")
+parser.add_argument("--no-save", action="store_true",
+                    help="start from a fresh profile and don't save progress")
+parser.add_argument("--leaderboard", metavar="URL",
+                    help="post finished runs to this leaderboard endpoint")
+parser.add_argument("--leaderboard-queue", default=leaderboard.QUEUE_PATH,
+                    help="file scores wait in while the leaderboard can't be reached")
+parser.add_argument("--startup-benchmark", action="store_true",
+                    help="print time to first frame as JSON and exit")
+parser.add_argument("--scenario", metavar="NAME",
+                    help="run a stress scenario from benchmark.py and print its results as JSON")
+parser.add_argument("--frames", type=int, default=600,
+                    help="frames to run in --scenario mode")
+args = parser.parse_args()
+
+telemetry.logger.configure(level=telemetry.LEVELS[args.log_level], path=args.log_file)
+
+# Initialize only the pygame modules the game uses; there is no sound, and
+# fonts start up the first time text is drawn
+pygame.display.init()
 
 # Colors
 WHITE = (255, 255, 255)
@@ -27,567 +91,624 @@ MENU_GRAY = (120, 120, 120)  # Gray color for menu showcase
 TEAL = (0, 128, 128)
 BUTTON_BLUE = (65, 105, 225)  # Royal blue for buttons
 
-# Create the game window
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
+# Reduced-resolution rendering. Layout stays in WIDTH x HEIGHT game
+# coordinates; the view functions map it onto the smaller render surface.
+render_scale = args.render_scale
+
+def view(value):
+    return round(value * render_scale)
+
+def view_pos(pos):
+    return (view(pos[0]), view(pos[1]))
+
+def view_rect(rect):
+    rect = pygame.Rect(rect)
+    x, y = view(rect.x), view(rect.y)
+    return pygame.Rect(x, y, view(rect.right) - x, view(rect.bottom) - y)
+
+def view_line(width):
+    return max(1, view(width))
+
+# Create the game window. `screen` is what everything draws to; with the
+# software scale mode it is an offscreen surface upscaled into `display`.
+render_size = (view(WIDTH), view(HEIGHT))
+if render_scale == 1:
+    display = screen = pygame.display.set_mode((WIDTH, HEIGHT))
+elif args.scale_mode == "sdl":
+    display = screen = pygame.display.set_mode(render_size, pygame.SCALED)
+else:
+    display = pygame.display.set_mode((WIDTH, HEIGHT))
+    screen = pygame.Surface(render_size).convert()
+upscale = screen is not display
 pygame.display.set_caption("Plane Collection Game")
 
-# Clock to control game speed
-clock = pygame.time.Clock()
+def mouse_pos():
+    # Mouse position on the render surface. pygame.SCALED already reports
+    # positions in render coordinates.
+    pos = pygame.mouse.get_pos()
+    return view_pos(pos) if upscale else pos
 
-# Game states
-MENU = 0
-PLAYING = 1
-GAME_OVER = 2
-UPGRADES = 3
-current_state = MENU
+# Clock to control render speed, and the fixed-step driver for gameplay
+clock = pygame.time.Clock()
+frame_cap = 0 if args.uncapped or args.scenario else args.fps
+stepper = FixedTimestep()
+
+# Partial screen updates when requested, full flips otherwise
+renderer = DirtyRenderer(screen, display if upscale else None) if args.dirty_rects else None
+
+# Per-phase frame timings, shown with F3
+profiler = FrameProfiler()
+show_profiler = False
+
+# Garbage collector pauses are timed as profiler phases when GC control or
+# a profile export is asked for; --gc-freeze keeps full collections out of
+# gameplay
+gc_control = GCControl(freeze=args.gc_freeze,
+                       profiler=profiler if args.gc_freeze or args.profile_out else None)
+
+# All gameplay state lives in the simulation; this file only draws it.
+# Every change to it goes through the recorder so the session can be replayed.
+seed = args.seed if args.seed is not None else random.SystemRandom().getrandbits(32)
+game = GameState(seed, profiler=profiler)
+
+# Currency and upgrades persist between sessions. Saves happen on a
+# background thread whenever they change; stress scenarios never save.
+profile_writer = None
+if not (args.no_save or args.scenario):
+    saved_profile = player_profile.load(args.save_file)
+    if saved_profile is not None:
+        player_profile.apply(game, saved_profile)
+    profile_writer = player_profile.ProfileWriter(args.save_file, player_profile.snapshot(game))
+recorder = Recorder(game)
+
+# Finished runs go to the leaderboard from a background thread, so a slow
+# or unreachable server never holds up the end screen
+leaderboard_client = None
+if args.leaderboard and not args.scenario:
+    leaderboard_client = leaderboard.LeaderboardClient(args.leaderboard, args.leaderboard_queue)
+
+# Stress scenarios drive the game themselves, one tick per frame, uncapped
+scenario_run = None
+if args.scenario:
+    import benchmark
+    scenario_run = benchmark.ScenarioRun(args.scenario, args.frames)
+    scenario_run.scenario.setup(game)
 
 # Load images
-# Make sure these image files exist in the same directory as the script
+# Make sure these image files exist in the same directory as the script.
+# The scaled sprites are cached in one atlas file after the first start.
 try:
-    plane_img = pygame.image.load("./image-removebg-preview (3).png").convert_alpha()
-    collect_img = pygame.image.load("./image-removebg-preview (4).png").convert_alpha()
-    avoid_img = pygame.image.load("./image-removebg-preview (6).png").convert_alpha()
+    sprites = assets.load_sprites(scale=render_scale)
+    plane_img = sprites["plane"]
+    collect_img = sprites["collect"]
+    avoid_img = sprites["avoid"]
     
-    # Resize images if needed
-    plane_width = 70  # Made bigger
-    plane_height = 50  # Made bigger
-    plane_img = pygame.transform.scale(plane_img, (plane_width, plane_height))
-    
-    item_size = 40  # Made bigger
-    collect_img = pygame.transform.scale(collect_img, (item_size, item_size))
-    avoid_img = pygame.transform.scale(avoid_img, (item_size, item_size))
-    
-except pygame.error as e:
+except (pygame.error, OSError) as e:
     print(f"Error loading images: {e}")
     print("Using default shapes instead.")
-    # We'll fall back to shapes if images can't be loaded
-    plane_img = None
-    collect_img = None
-    avoid_img = None
-
-# Game variables
-collected_towers = 0  # New currency for upgrades
-game_over = False
-game_won = False
-win_time = 0  # For tracking the win screen timer
-
-# Player (plane) properties
-player_width = 80  # Made bigger
-player_height = 60  # Made bigger
-player_x = WIDTH // 2 - player_width // 2
-player_y = HEIGHT - player_height - 20
-base_player_speed = 5
-player_speed = base_player_speed
-
-# Upgrade variables
-speed_level = 0
-tower_level = 0
-eagle_level = 0
-currency_per_tower = 1  # New currency per collection
-speed_cost = 5  # Reduced costs to match new currency
-tower_cost = 3
-eagle_cost = 4
-currency_boost_cost = 5  # Cost for boosting currency per tower
-max_upgrade_level = 5
-
-# Spawn chances - MODIFIED: default more eagles
-tower_chance = 0.2  # Default 20% chance for towers (was 0.3)
-
-# Target for win condition
-tower_goal = 25  # Need to collect this many towers to win
-
-# Items and obstacles
-items = []
-item_speed = 5
-spawn_rate = 40  # Frames between spawns
-spawn_counter = 0
+    # Fall back to simple shapes, drawn once into sprites of their own
+    plane_img = pygame.Surface((view(player_width) + 1, view(player_height) + 1), pygame.SRCALPHA)
+    pygame.draw.polygon(plane_img, BLUE, [
+        (0, view(player_height)),
+        (view(player_width // 2), 0),
+        (view(player_width), view(player_height))
+    ])
+    # Add wings
+    pygame.draw.rect(plane_img, BLUE, view_rect((10, player_height - 15, player_width - 20, 10)))
+    item_view = view(item_size)
+    collect_img = pygame.Surface((item_view, item_view), pygame.SRCALPHA)
+    pygame.draw.circle(collect_img, GOLD, (item_view//2, item_view//2), item_view//2)
+    avoid_img = pygame.Surface((item_view, item_view), pygame.SRCALPHA)
+    pygame.draw.circle(avoid_img, RED, (item_view//2, item_view//2), item_view//2)
+
+# Item sprites indexed by the store's type column
+item_images = [None, None]
+item_images[COLLECT] = collect_img
+item_images[AVOID] = avoid_img
 
 # Create close button (only for gameplay and upgrade screens)
 close_button_size = 30
 close_button_x = WIDTH - close_button_size - 10
 close_button_y = 10
-
-# Font for text
-font = pygame.font.SysFont(None, 36)
-title_font = pygame.font.SysFont(None, 64)
-small_font = pygame.font.SysFont(None, 24)
-
-# Button class for menu
-class Button:
-    def __init__(self, x, y, width, height, text, color, hover_color):
-        self.rect = pygame.Rect(x, y, width, height)
-        self.text = text
-        self.color = color
-        self.hover_color = hover_color
-        self.is_hovered = False
-        
-    def draw(self):
-        color = self.hover_color if self.is_hovered else self.color
-        pygame.draw.rect(screen, color, self.rect, border_radius=10)
-        pygame.draw.rect(screen, BLACK, self.rect, 3, border_radius=10)  # Border
-        
-        text_surf = font.render(self.text, True, WHITE)
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        screen.blit(text_surf, text_rect)
-        
-    def check_hover(self, pos):
-        self.is_hovered = self.rect.collidepoint(pos)
-        
-    def is_clicked(self, pos, click):
-        return self.rect.collidepoint(pos) and click
+close_button_rect = pygame.Rect(close_button_x, close_button_y, close_button_size, close_button_size)
+
+# The close button never changes, so it is drawn once
+close_button_img = pygame.Surface((close_button_size, close_button_size)).convert()
+close_button_img.fill(RED)
+# Draw X
+pygame.draw.line(close_button_img, WHITE, (5, 5), (close_button_size - 5, close_button_size - 5), 3)
+pygame.draw.line(close_button_img, WHITE, (close_button_size - 5, 5), (5, close_button_size - 5), 3)
+close_button_view = view_rect(close_button_rect)
+if render_scale != 1:
+    close_button_img = pygame.transform.smoothscale(close_button_img, close_button_view.size)
+
+# Font for text, loaded on first use at the size it is drawn at
+font = LazyFont(None, view(36))
+title_font = LazyFont(None, view(64))
+small_font = LazyFont(None, view(24))
+profiler_font = LazyFont("monospace", view(14))
 
 # Create buttons for menu
-play_button = Button(WIDTH//2 - 100, HEIGHT//2 - 100, 200, 60, "Play Game", GREEN, (0, 220, 0))
-upgrades_button = Button(WIDTH//2 - 100, HEIGHT//2, 200, 60, "Upgrades", PURPLE, (180, 0, 180))
-quit_button = Button(WIDTH//2 - 100, HEIGHT//2 + 100, 200, 60, "Quit Game", RED, (220, 0, 0))
+play_button = Button(WIDTH//2 - 100, HEIGHT//2 - 100, 200, 60, "Play Game", GREEN, (0, 220, 0), font, scale=render_scale)
+upgrades_button = Button(WIDTH//2 - 100, HEIGHT//2, 200, 60, "Upgrades", PURPLE, (180, 0, 180), font, scale=render_scale)
+quit_button = Button(WIDTH//2 - 100, HEIGHT//2 + 100, 200, 60, "Quit Game", RED, (220, 0, 0), font, scale=render_scale)
+
+# Upgrade menu buttons. Each is bound to the level and cost it shows, so
+# its label is only rebuilt after a purchase or a change in currency.
+upgrade_labels = {
+    "speed": ("Speed Up", lambda: (game.speed_level, game.speed_cost)),
+    "tower": ("More Towers", lambda: (game.tower_level, game.tower_cost)),
+    "eagle": ("Less Eagles", lambda: (game.eagle_level, game.eagle_cost)),
+    "currency": ("More Currency", lambda: (game.currency_per_tower-1, game.currency_boost_cost)),
+}
+
+def upgrade_binding(upgrade_type):
+    label, level_and_cost = upgrade_labels[upgrade_type]
+    def bind():
+        level, cost = level_and_cost()
+        # Disable buttons if max level reached or not enough currency
+        if level >= max_upgrade_level:
+            return f"{label} (MAX LEVEL)", False
+        return f"{label} (Level {level}/{max_upgrade_level}) - {cost} currency", game.can_buy(upgrade_type)
+    return bind
+
+def upgrade_button(y, upgrade_type):
+    return Button(WIDTH//2 - 200, y, 400, 50, "", TEAL, (0, 160, 160), font,
+                  bind=upgrade_binding(upgrade_type), scale=render_scale)
+
+# Upgrade screen buttons are built the first time that screen is shown,
+# and their click targets are added along with them
+upgrade_buttons = None
+
+def get_upgrade_buttons():
+    global upgrade_buttons
+    if upgrade_buttons is None:
+        upgrade_buttons = {
+            "back": Button(WIDTH//2 - 100, HEIGHT - 80, 200, 60, "Back to Menu", BUTTON_BLUE, (100, 149, 237), font,
+                           scale=render_scale),
+            "speed": upgrade_button(HEIGHT//2 - 180, "speed"),
+            "tower": upgrade_button(HEIGHT//2 - 110, "tower"),
+            "eagle": upgrade_button(HEIGHT//2 - 40, "eagle"),
+            "currency": upgrade_button(HEIGHT//2 + 30, "currency"),
+        }
+        click_targets[UPGRADES].append((upgrade_buttons["back"], lambda: recorder.command("go_to_menu")))
+        click_targets[UPGRADES].extend(
+            (upgrade_buttons[upgrade_type], buy_action(upgrade_type)) for upgrade_type in upgrade_types)
+    return upgrade_buttons
+
+# Upgrades in the order their buttons appear
+upgrade_types = ("speed", "tower", "eagle", "currency")
+
+# Back button on the game over screen
+end_back_button = Button(WIDTH//2 - 150, HEIGHT//2 + 30, 300, 60, "Back to Menu", BLUE, (30, 30, 220), font, scale=render_scale)
+
+# Close button (only for gameplay and upgrade screens)
+close_hotspot = Hotspot(close_button_view)
+
+def quit_game():
+    global running
+    running = False
+
+def buy_action(upgrade_type):
+    return lambda: recorder.buy_upgrade(upgrade_type)
+
+# What a click does on each screen: (widget, action) pairs, first hit wins
+click_targets = {
+    MENU: [
+        (play_button, lambda: recorder.command("start_game")),
+        (upgrades_button, lambda: recorder.command("open_upgrades")),
+        (quit_button, quit_game),
+    ],
+    PLAYING: [
+        (close_hotspot, lambda: recorder.command("go_to_menu")),
+    ],
+    UPGRADES: [
+        (close_hotspot, lambda: recorder.command("go_to_menu")),
+    ],
+    GAME_OVER: [
+        (end_back_button, lambda: recorder.command("go_to_menu")),
+        (quit_button, quit_game),
+    ],
+}
+
+def update_hover(state):
+    pos = mouse_pos()
+    for widget, _ in click_targets[state]:
+        widget.check_hover(pos)
+
+def draw_widget(key, value, rect, draw):
+    # Full redraws always draw; the dirty-rect renderer skips unchanged widgets
+    if renderer:
+        renderer.widget(key, value, rect, draw)
+    else:
+        draw()
 
-# Upgrade menu buttons
-back_button = Button(WIDTH//2 - 100, HEIGHT - 80, 200, 60, "Back to Menu", BUTTON_BLUE, (100, 149, 237))
-speed_button = Button(WIDTH//2 - 200, HEIGHT//2 - 180, 400, 50, f"Speed Up (+{speed_cost})", GREEN, (0, 220, 0))
-tower_button = Button(WIDTH//2 - 200, HEIGHT//2 - 110, 400, 50, f"More Towers (+{tower_cost})", GREEN, (0, 220, 0))
-eagle_button = Button(WIDTH//2 - 200, HEIGHT//2 - 40, 400, 50, f"Less Eagles (+{eagle_cost})", GREEN, (0, 220, 0))
-currency_button = Button(WIDTH//2 - 200, HEIGHT//2 + 30, 400, 50, f"More Currency (+{currency_boost_cost})", GREEN, (0, 220, 0))
+def mark_sprite(rect):
+    if renderer:
+        renderer.sprite(rect)
 
-def draw_player():
-    if plane_img:
-        screen.blit(plane_img, (player_x, player_y))
+def begin_screen(background):
+    if renderer:
+        renderer.begin(background)
     else:
-        # Fallback to drawing a simple plane shape
-        pygame.draw.polygon(screen, BLUE, [
-            (player_x, player_y + player_height),
-            (player_x + player_width // 2, player_y),
-            (player_x + player_width, player_y + player_height)
-        ])
-        # Add wings
-        pygame.draw.rect(screen, BLUE, (player_x + 10, player_y + player_height - 15, 
-                                         player_width - 20, 10))
-
-def create_item():
-    # Calculate adjusted tower chance based on tower level
-    adjusted_tower_chance = tower_chance + (tower_level * 0.05)
-    
-    # Calculate adjusted eagle reduction based on eagle level
-    eagle_reduction = eagle_level * 0.1
-    adjusted_eagle_chance = 1.0 - adjusted_tower_chance - eagle_reduction
-    
-    # Ensure we don't go below minimum eagle chance
-    if adjusted_eagle_chance < 0.05:
-        adjusted_eagle_chance = 0.05
-        adjusted_tower_chance = 0.95 - adjusted_eagle_chance
-    
-    # For debugging
-    print(f"Tower chance: {adjusted_tower_chance}, Eagle chance: {adjusted_eagle_chance}")
-    
-    # Determine item type based on adjusted chances
-    rand_val = random.random()
-    item_type = "collect" if rand_val < adjusted_tower_chance else "avoid"
-    print(f"Created item of type: {item_type}, random value: {rand_val}")
-    
-    item_x = random.randint(20, WIDTH - 20)
-    items.append({
-        "x": item_x, 
-        "y": 0, 
-        "type": item_type,
-        "width": item_size,
-        "height": item_size
-    })
+        screen.blit(background, (0, 0))
+
+def draw_button(button):
+    draw_widget(button, (button.text, button.state), button.get_bounds(), lambda: button.draw(screen))
+
+def draw_text_widget(key, text_font, text, color, **position):
+    # position is a get_rect() keyword in game coordinates, e.g. center=(x, y)
+    text_surf = render_text(text_font, text, True, color)
+    text_rect = text_surf.get_rect(**{name: view_pos(pos) for name, pos in position.items()})
+    draw_widget(key, text, text_rect, lambda: screen.blit(text_surf, text_rect))
+
+def draw_player():
+    player_x = game.render_player_x(stepper.alpha)
+    mark_sprite(screen.blit(plane_img, (player_x * render_scale, player_y * render_scale)))
 
 def draw_items():
-    for item in items:
-        if item["type"] == "collect":
-            if collect_img:
-                screen.blit(collect_img, (item["x"] - item_size//2, item["y"] - item_size//2))
-            else:
-                pygame.draw.circle(screen, GOLD, (item["x"], item["y"]), item_size//2)
-        else:
-            if avoid_img:
-                screen.blit(avoid_img, (item["x"] - item_size//2, item["y"] - item_size//2))
-            else:
-                pygame.draw.circle(screen, RED, (item["x"], item["y"]), item_size//2)
-
-def move_items():
-    for item in items[:]:
-        item["y"] += item_speed
-        # Remove items that fall off screen
-        if item["y"] > HEIGHT:
-            items.remove(item)
-
-def check_collisions():
-    global collected_towers, game_over, game_won, current_state
-    for item in items[:]:
-        # Create a hitbox for the item
-        item_rect = pygame.Rect(
-            item["x"] - item_size//2, 
-            item["y"] - item_size//2, 
-            item_size, 
-            item_size
-        )
-        
-        # Create a hitbox for the player
-        player_rect = pygame.Rect(player_x, player_y, player_width, player_height)
-        
-        # Check if player collided with item
-        if player_rect.colliderect(item_rect):
-            print(f"Collision detected with item type: {item['type']}")
-            items.remove(item)
-            if item["type"] == "collect":
-                # Add currency based on currency_per_tower
-                collected_towers += currency_per_tower
-                print(f"Collected towers increased to: {collected_towers}")
-                if collected_towers >= tower_goal:
-                    game_won = True
-                    win_time = time.time()
-                    current_state = GAME_OVER
-            else:
-                game_over = True
-                current_state = GAME_OVER
+    # Every item in one blits() call, built straight from the store columns
+    store = game.items
+    n = store.count
+    if n == 0:
+        return
+    half = item_size//2
+    xs = store.x[:n] - half
+    ys = store.y[:n] + (game.render_item_offset(stepper.alpha) - half)
+    if render_scale != 1:
+        xs = xs * render_scale
+        ys = ys * render_scale
+    xs = xs.tolist()
+    ys = ys.tolist()
+    images = map(item_images.__getitem__, store.type[:n].tolist())
+    rects = screen.blits(zip(images, zip(xs, ys)), doreturn=renderer is not None)
+    if renderer:
+        renderer.sprites(rects)
 
 def draw_progress():
     # Draw tower collection progress
-    progress_text = font.render(f"Towers: {collected_towers}/{tower_goal}", True, BLACK)
-    screen.blit(progress_text, (10, 10))
+    progress_text = render_text(font, f"Towers: {game.collected_towers}/{tower_goal}", True, BLACK)
+    mark_sprite(screen.blit(progress_text, view_pos((10, 10))))
     
     # Display currency per tower
-    currency_text = font.render(f"Currency per tower: {currency_per_tower}", True, BLACK)
-    screen.blit(currency_text, (10, 50))
+    currency_text = render_text(font, f"Currency per tower: {game.currency_per_tower}", True, BLACK)
+    mark_sprite(screen.blit(currency_text, view_pos((10, 50))))
 
 def draw_close_button():
-    pygame.draw.rect(screen, RED, (close_button_x, close_button_y, 
-                                  close_button_size, close_button_size))
-    # Draw X
-    pygame.draw.line(screen, WHITE, 
-                     (close_button_x + 5, close_button_y + 5),
-                     (close_button_x + close_button_size - 5, close_button_y + close_button_size - 5), 
-                     3)
-    pygame.draw.line(screen, WHITE, 
-                     (close_button_x + close_button_size - 5, close_button_y + 5),
-                     (close_button_x + 5, close_button_y + close_button_size - 5), 
-                     3)
+    screen.blit(close_button_img, close_button_view)
 
-def draw_menu():
+def draw_close_widget():
+    draw_widget("close", None, close_button_view, draw_close_button)
+
+# Pre-composited static layers, built the first time each screen is shown
+backgrounds = {}
+
+def get_background(name, build):
+    background = backgrounds.get(name)
+    if background is None:
+        background = pygame.Surface(render_size).convert()
+        build(background)
+        backgrounds[name] = background
+    return background
+
+def build_playing_background(surface):
+    surface.fill(SKY_BLUE)
+
+def build_menu_background(surface):
     # Draw background
-    screen.fill(SKY_BLUE)
+    surface.fill(SKY_BLUE)
     
     # Draw title
-    title_text = title_font.render("Plane Collection Game", True, BLUE)
-    title_rect = title_text.get_rect(center=(WIDTH//2, HEIGHT//4 - 30))
-    screen.blit(title_text, title_rect)
-    
-    # Draw buttons in the middle
-    play_button.draw()
-    upgrades_button.draw()
-    quit_button.draw()
-    
-    # Update button hover state
-    mouse_pos = pygame.mouse.get_pos()
-    play_button.check_hover(mouse_pos)
-    upgrades_button.check_hover(mouse_pos)
-    quit_button.check_hover(mouse_pos)
+    title_text = render_text(title_font, "Plane Collection Game", True, BLUE)
+    title_rect = title_text.get_rect(center=view_pos((WIDTH//2, HEIGHT//4 - 30)))
+    surface.blit(title_text, title_rect)
     
     # Draw bottom menu showcase with gray background
-    showcase_height = 150
-    showcase_rect = pygame.Rect(0, HEIGHT - showcase_height, WIDTH, showcase_height)
-    pygame.draw.rect(screen, MENU_GRAY, showcase_rect)
-    pygame.draw.line(screen, BLACK, (0, HEIGHT - showcase_height), (WIDTH, HEIGHT - showcase_height), 3)
-    
-    # Draw instructions in the showcase area
-    instructions = [
+    showcase_rect = view_rect((0, HEIGHT - showcase_height, WIDTH, showcase_height))
+    pygame.draw.rect(surface, MENU_GRAY, showcase_rect)
+    pygame.draw.line(surface, BLACK, view_pos((0, HEIGHT - showcase_height)),
+                     view_pos((WIDTH, HEIGHT - showcase_height)), view_line(3))
+    
+    # Instructions that never change
+    for i, line in enumerate(menu_instructions()):
+        if i in menu_dynamic_lines:
+            continue
+        text = render_text(font, line, True, WHITE)
+        text_rect = text.get_rect(center=view_pos((WIDTH//2, HEIGHT - showcase_height + 30 + i*25)))
+        surface.blit(text, text_rect)
+
+# Height of the bottom menu showcase
+showcase_height = 150
+
+# Instruction lines in the showcase that depend on game state
+menu_dynamic_lines = (2, 4)
+
+def menu_instructions():
+    return [
         "Use LEFT and RIGHT arrow keys to move the plane",
         "Collect the towers and avoid the eagles",
-        f"Each tower is worth {currency_per_tower} currency",
+        f"Each tower is worth {game.currency_per_tower} currency",
         f"Collect {tower_goal} towers to win!",
-        f"Current Currency: {collected_towers}"
+        f"Current Currency: {game.collected_towers}"
     ]
+
+def draw_menu():
+    begin_screen(get_background("menu", build_menu_background))
     
-    for i, line in enumerate(instructions):
-        text = font.render(line, True, WHITE)
-        text_rect = text.get_rect(center=(WIDTH//2, HEIGHT - showcase_height + 30 + i*25))
-        screen.blit(text, text_rect)
+    # Update button hover state
+    update_hover(MENU)
+    
+    # Draw buttons in the middle
+    draw_button(play_button)
+    draw_button(upgrades_button)
+    draw_button(quit_button)
+    
+    # Draw the instructions that change in the showcase area
+    instructions = menu_instructions()
+    for i in menu_dynamic_lines:
+        draw_text_widget(("menu_line", i), font, instructions[i], WHITE,
+                         center=(WIDTH//2, HEIGHT - showcase_height + 30 + i*25))
 
-def draw_upgrades_menu():
+# Rows of the upgrade descriptions
+upgrade_y_positions = [HEIGHT//2 - 140, HEIGHT//2 - 70, HEIGHT//2, HEIGHT//2 + 70]
+
+def build_upgrades_background(surface):
     # Use a gradient background
-    screen.fill(LIGHT_GRAY)
+    surface.fill(LIGHT_GRAY)
     
     # Draw title with better styling
-    title_text = title_font.render("UPGRADES", True, PURPLE)
-    title_rect = title_text.get_rect(center=(WIDTH//2, 50))
-    screen.blit(title_text, title_rect)
+    title_text = render_text(title_font, "UPGRADES", True, PURPLE)
+    title_rect = title_text.get_rect(center=view_pos((WIDTH//2, 50)))
+    surface.blit(title_text, title_rect)
     
     # Draw a decorative header line
-    pygame.draw.line(screen, PURPLE, (WIDTH//4, 85), (WIDTH*3//4, 85), 3)
+    pygame.draw.line(surface, PURPLE, view_pos((WIDTH//4, 85)), view_pos((WIDTH*3//4, 85)), view_line(3))
     
     # Display current currency with better styling and make it more prominent
-    currency_bg = pygame.Rect(WIDTH//2 - 200, 100, 400, 50)
-    pygame.draw.rect(screen, DARK_BLUE, currency_bg, border_radius=5)
-    pygame.draw.rect(screen, GOLD, currency_bg, 3, border_radius=5)  # Add gold border
+    currency_bg = view_rect((WIDTH//2 - 200, 100, 400, 50))
+    pygame.draw.rect(surface, DARK_BLUE, currency_bg, border_radius=view(5))
+    pygame.draw.rect(surface, GOLD, currency_bg, view_line(3), border_radius=view(5))  # Add gold border
     
-    currency_text = title_font.render(f"CURRENCY: {collected_towers}", True, GOLD)
-    currency_rect = currency_text.get_rect(center=(WIDTH//2, 125))
-    screen.blit(currency_text, currency_rect)
+    # Draw description backgrounds
+    for y in upgrade_y_positions:
+        desc_bg = view_rect((WIDTH//2 - 210, y - 10, 420, 25))
+        pygame.draw.rect(surface, (220, 220, 240), desc_bg, border_radius=view(5))
+
+def draw_upgrades_menu():
+    begin_screen(get_background("upgrades", build_upgrades_background))
     
-    # Update button texts with current costs and levels
-    speed_button.text = f"Speed Up (Level {speed_level}/{max_upgrade_level}) - {speed_cost} currency"
-    tower_button.text = f"More Towers (Level {tower_level}/{max_upgrade_level}) - {tower_cost} currency"
-    eagle_button.text = f"Less Eagles (Level {eagle_level}/{max_upgrade_level}) - {eagle_cost} currency"
-    currency_button.text = f"More Currency (Level {currency_per_tower-1}/{max_upgrade_level}) - {currency_boost_cost} currency"
+    draw_text_widget("currency", title_font, f"CURRENCY: {game.collected_towers}", GOLD,
+                     center=(WIDTH//2, 125))
     
     # Draw upgrade descriptions with better styling
     descriptions = [
-        f"Current Speed: {base_player_speed + speed_level * 2}",
-        f"Tower Spawn Rate: {int((tower_chance + tower_level * 0.05) * 100)}%",
-        f"Eagle Reduction: {eagle_level * 10}%",
-        f"Currency per Tower: {currency_per_tower}"
+        f"Current Speed: {game.player_speed}",
+        f"Tower Spawn Rate: {int((tower_chance + game.tower_level * tower_chance_per_level) * 100)}%",
+        f"Eagle Reduction: {round(game.eagle_level * eagle_reduction_per_level * 100)}%",
+        f"Currency per Tower: {game.currency_per_tower}"
     ]
     
-    y_positions = [HEIGHT//2 - 140, HEIGHT//2 - 70, HEIGHT//2, HEIGHT//2 + 70]
-    
     for i, desc in enumerate(descriptions):
-        # Draw description background
-        desc_bg = pygame.Rect(WIDTH//2 - 210, y_positions[i] - 10, 420, 25)
-        pygame.draw.rect(screen, (220, 220, 240), desc_bg, border_radius=5)
-        
-        # Draw description text
-        text = small_font.render(desc, True, DARK_GRAY)
-        text_rect = text.get_rect(center=(WIDTH//2, y_positions[i]))
-        screen.blit(text, text_rect)
-    
-    # Disable buttons if max level reached or not enough currency
-    if speed_level >= max_upgrade_level:
-        speed_button.color = DARK_GRAY
-        speed_button.hover_color = DARK_GRAY
-        speed_button.text = f"Speed Up (MAX LEVEL)"
-    elif collected_towers < speed_cost:
-        speed_button.color = DARK_GRAY
-        speed_button.hover_color = DARK_GRAY
-    else:
-        speed_button.color = TEAL
-        speed_button.hover_color = (0, 160, 160)
-    
-    if tower_level >= max_upgrade_level:
-        tower_button.color = DARK_GRAY
-        tower_button.hover_color = DARK_GRAY
-        tower_button.text = f"More Towers (MAX LEVEL)"
-    elif collected_towers < tower_cost:
-        tower_button.color = DARK_GRAY
-        tower_button.hover_color = DARK_GRAY
-    else:
-        tower_button.color = TEAL
-        tower_button.hover_color = (0, 160, 160)
-    
-    if eagle_level >= max_upgrade_level:
-        eagle_button.color = DARK_GRAY
-        eagle_button.hover_color = DARK_GRAY
-        eagle_button.text = f"Less Eagles (MAX LEVEL)"
-    elif collected_towers < eagle_cost:
-        eagle_button.color = DARK_GRAY
-        eagle_button.hover_color = DARK_GRAY
-    else:
-        eagle_button.color = TEAL
-        eagle_button.hover_color = (0, 160, 160)
-    
-    if currency_per_tower-1 >= max_upgrade_level:
-        currency_button.color = DARK_GRAY
-        currency_button.hover_color = DARK_GRAY
-        currency_button.text = f"More Currency (MAX LEVEL)"
-    elif collected_towers < currency_boost_cost:
-        currency_button.color = DARK_GRAY
-        currency_button.hover_color = DARK_GRAY
-    else:
-        currency_button.color = TEAL
-        currency_button.hover_color = (0, 160, 160)
+        draw_text_widget(("description", i), small_font, desc, DARK_GRAY,
+                         center=(WIDTH//2, upgrade_y_positions[i]))
     
-    # Draw buttons
-    speed_button.draw()
-    tower_button.draw()
-    eagle_button.draw()
-    currency_button.draw()
-    back_button.draw()
+    # Refresh bound labels; unchanged buttons keep their cached surfaces
+    buttons = get_upgrade_buttons()
+    for upgrade_type in upgrade_types:
+        buttons[upgrade_type].update()
     
     # Update button hover state
-    mouse_pos = pygame.mouse.get_pos()
-    speed_button.check_hover(mouse_pos)
-    tower_button.check_hover(mouse_pos)
-    eagle_button.check_hover(mouse_pos)
-    currency_button.check_hover(mouse_pos)
-    back_button.check_hover(mouse_pos)
-
-def buy_upgrade(upgrade_type):
-    global collected_towers, speed_level, tower_level, eagle_level
-    global player_speed, speed_cost, tower_cost, eagle_cost, currency_boost_cost
-    global currency_per_tower
-    
-    if upgrade_type == "speed" and speed_level < max_upgrade_level and collected_towers >= speed_cost:
-        collected_towers -= speed_cost
-        speed_level += 1
-        player_speed = base_player_speed + (speed_level * 2)
-        speed_cost = int(speed_cost * 1.5)  # Increase cost for next level
-        
-    elif upgrade_type == "tower" and tower_level < max_upgrade_level and collected_towers >= tower_cost:
-        collected_towers -= tower_cost
-        tower_level += 1
-        tower_cost = int(tower_cost * 1.5)  # Increase cost for next level
-        
-    elif upgrade_type == "eagle" and eagle_level < max_upgrade_level and collected_towers >= eagle_cost:
-        collected_towers -= eagle_cost
-        eagle_level += 1
-        eagle_cost = int(eagle_cost * 1.5)  # Increase cost for next level
-        
-    elif upgrade_type == "currency" and currency_per_tower-1 < max_upgrade_level and collected_towers >= currency_boost_cost:
-        collected_towers -= currency_boost_cost
-        currency_per_tower += 1  # Each level adds +1 currency per collection
-        currency_boost_cost = int(currency_boost_cost * 1.5)  # Increase cost for next level
+    update_hover(UPGRADES)
+    
+    # Draw buttons
+    for upgrade_type in upgrade_types:
+        draw_button(buttons[upgrade_type])
+    draw_button(buttons["back"])
+
+def build_end_background(surface):
+    surface.fill(DARK_BLUE)
 
 def show_end_screen():
-    screen.fill(DARK_BLUE)
+    begin_screen(get_background("end", build_end_background))
     
-    if game_won:
+    if game.game_won:
         message = f"You Win! You collected {tower_goal} towers!"
         color = GOLD
         
         # Show countdown timer
-        elapsed = time.time() - win_time
-        remaining = 5 - elapsed
+        remaining = game.win_time_remaining()
         
         if remaining <= 0:
-            reset_game()
-            return MENU
+            recorder.command("go_to_menu")
+            return
         
-        timer_text = font.render(f"Returning to menu in: {int(remaining)}s", True, WHITE)
-        timer_rect = timer_text.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 100))
-        screen.blit(timer_text, timer_rect)
+        draw_text_widget("timer", font, f"Returning to menu in: {int(remaining)}s", WHITE,
+                         center=(WIDTH // 2, HEIGHT // 3 + 100))
     else:
         message = "Game Over! You hit an eagle."
         color = RED
     
-    text = font.render(message, True, color)
-    text_rect = text.get_rect(center=(WIDTH // 2, HEIGHT // 3))
-    screen.blit(text, text_rect)
-    
-    score_text = font.render(f"Towers Collected: {collected_towers}/{tower_goal}", True, WHITE)
-    score_rect = score_text.get_rect(center=(WIDTH // 2, HEIGHT // 3 + 50))
-    screen.blit(score_text, score_rect)
+    draw_text_widget("message", font, message, color, center=(WIDTH // 2, HEIGHT // 3))
+    draw_text_widget("score", font, f"Towers Collected: {game.collected_towers}/{tower_goal}", WHITE,
+                     center=(WIDTH // 2, HEIGHT // 3 + 50))
     
     # Only show buttons if game was lost (not won)
-    if not game_won:
-        # Draw buttons for end screen
-        back_to_menu = Button(WIDTH//2 - 150, HEIGHT//2 + 30, 300, 60, "Back to Menu", BLUE, (30, 30, 220))
-        back_to_menu.draw()
-        
-        quit_button.draw()
-        
-        # Check button hover
-        mouse_pos = pygame.mouse.get_pos()
-        back_to_menu.check_hover(mouse_pos)
-        quit_button.check_hover(mouse_pos)
-        
-        # Check button clicks
-        if pygame.mouse.get_pressed()[0]:
-            if back_to_menu.is_clicked(mouse_pos, True):
-                reset_game()
-                return MENU
-            elif quit_button.is_clicked(mouse_pos, True):
-                return "QUIT"
-    
-    return GAME_OVER
-
-def reset_game():
-    global collected_towers, game_over, game_won, items, player_x
-    # Don't reset collected_towers when going back to menu
-    # So player keeps their upgrade currency
-    game_over = False
-    game_won = False
-    items = []
-    player_x = WIDTH // 2 - player_width // 2
+    if not game.game_won:
+        update_hover(GAME_OVER)
+        draw_button(end_back_button)
+        draw_button(quit_button)
+
+# Profiler overlay lines, refreshed a few times a second
+profiler_lines = []
+profiler_refresh = 30
+
+def draw_profiler_overlay():
+    global profiler_lines
+    if not profiler_lines or profiler.frames % profiler_refresh == 0:
+        profiler_lines = [f"{'phase':<18}{'p50':>7}{'p95':>7}{'p99':>7}"]
+        for row in profiler.stats():
+            profiler_lines.append(f"{row['phase']:<18}{row['p50_ms']:>7.2f}{row['p95_ms']:>7.2f}{row['p99_ms']:>7.2f}")
+    
+    line_height = view(18)
+    overlay = pygame.Surface((view(300), line_height * len(profiler_lines) + view(10)), pygame.SRCALPHA)
+    overlay.fill((0, 0, 0, 170))
+    for i, line in enumerate(profiler_lines):
+        overlay.blit(render_text(profiler_font, line, True, WHITE), (view(5), view(5) + i * line_height))
+    mark_sprite(screen.blit(overlay, view_pos((10, 90))))
+
+# Screens with nothing animating are only redrawn when an event arrives.
+# The timeout lets the loop check in now and then even with no input.
+idle_timeout = 500  # ms
+
+def is_idle():
+    if scenario_run or args.startup_benchmark or show_profiler:
+        return False
+    if game.current_state == GAME_OVER:
+        # The win screen counts down in real time
+        return not game.game_won
+    return game.current_state in (MENU, UPGRADES)
+
+# Startup is done: everything allocated so far lives for the whole session
+gc_control.startup_done()
+alloc_probe = AllocationProbe() if args.trace_alloc else None
 
 # Main game loop
 running = True
+drawn = False
+last_time = time.perf_counter()
 while running:
+    # Sleep on static screens until there is input to react to
+    woken_by = []
+    if drawn and is_idle():
+        event = pygame.event.wait(idle_timeout)
+        if event.type != pygame.NOEVENT:
+            woken_by.append(event)
+        # Time spent asleep is not frame time; otherwise the first frame
+        # after clicking Play would run a full catch-up of ticks
+        last_time = time.perf_counter()
+    
+    now = time.perf_counter()
+    frame_time = tick_time if scenario_run else now - last_time
+    last_time = now
+    
     # Handle events
-    for event in pygame.event.get():
+    with profiler.phase("events"):
+        events = woken_by + pygame.event.get()
+    for event in events:
         if event.type == pygame.QUIT:
             running = False
         
-        # Mouse click processing
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_pos = pygame.mouse.get_pos()
-            
-            # Check close button (only in gameplay and upgrade screens)
-            if current_state in [PLAYING, UPGRADES]:
-                if (close_button_x < mouse_pos[0] < close_button_x + close_button_size and
-                    close_button_y < mouse_pos[1] < close_button_y + close_button_size):
-                    current_state = MENU
-                    reset_game()
-            
-            # Check menu buttons
-            if current_state == MENU:
-                if play_button.is_clicked(mouse_pos, True):
-                    current_state = PLAYING
-                    reset_game()
-                elif upgrades_button.is_clicked(mouse_pos, True):
-                    current_state = UPGRADES
-                elif quit_button.is_clicked(mouse_pos, True):
-                    running = False
-            
-            # Check upgrade menu buttons
-            elif current_state == UPGRADES:
-                if back_button.is_clicked(mouse_pos, True):
-                    current_state = MENU
-                elif speed_button.is_clicked(mouse_pos, True) and speed_level < max_upgrade_level and collected_towers >= speed_cost:
-                    buy_upgrade("speed")
-                elif tower_button.is_clicked(mouse_pos, True) and tower_level < max_upgrade_level and collected_towers >= tower_cost:
-                    buy_upgrade("tower")
-                elif eagle_button.is_clicked(mouse_pos, True) and eagle_level < max_upgrade_level and collected_towers >= eagle_cost:
-                    buy_upgrade("eagle")
-                elif currency_button.is_clicked(mouse_pos, True) and currency_per_tower-1 < max_upgrade_level and collected_towers >= currency_boost_cost:
-                    buy_upgrade("currency")
+        # Toggle the profiler overlay
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            show_profiler = not show_profiler
+        
+        # Mouse clicks go to the widgets of the current screen. The win
+        # screen has no buttons.
+        if event.type == pygame.MOUSEBUTTONDOWN and not (game.current_state == GAME_OVER and game.game_won):
+            dispatch_click(click_targets[game.current_state], mouse_pos())
+    
+    # Gameplay time only accumulates while playing
+    if game.current_state != PLAYING:
+        stepper.reset()
     
     # Different handling based on game state
-    if current_state == MENU:
-        draw_menu()
+    if game.current_state == MENU:
+        with profiler.phase("draw_menu"):
+            draw_menu()
         # No close button in menu
     
-    elif current_state == PLAYING:
+    elif game.current_state == PLAYING:
         # Get key states for continuous movement
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT] and player_x > 0:
-            player_x -= player_speed
-        if keys[pygame.K_RIGHT] and player_x < WIDTH - player_width:
-            player_x += player_speed
+        with profiler.phase("input"):
+            keys = pygame.key.get_pressed()
+            inputs = Inputs(left=keys[pygame.K_LEFT], right=keys[pygame.K_RIGHT])
+            if scenario_run:
+                inputs = scenario_run.scenario.inputs(game.tick)
         
-        # Spawn new items
-        spawn_counter += 1
-        if spawn_counter >= spawn_rate:
-            create_item()
-            spawn_counter = 0
+        # Run however many fixed ticks fit in the time since the last frame
+        for _ in range(stepper.advance(frame_time)):
+            recorder.step(inputs)
+            if scenario_run:
+                scenario_run.scenario.after_step(game)
         
-        # Move items and check collisions
-        move_items()
-        check_collisions()
+        # The run just ended on a tower or an eagle
+        if leaderboard_client and game.current_state == GAME_OVER:
+            leaderboard_client.submit(leaderboard.run_result(game))
         
         # Draw everything
-        screen.fill(SKY_BLUE)
-        draw_player()
-        draw_items()
-        draw_progress()
-        draw_close_button()  # Keep close button in gameplay
-    
-    elif current_state == GAME_OVER:
-        result = show_end_screen()
-        if result == MENU:
-            current_state = MENU
-        elif result == "QUIT":
-            running = False
-    
-    elif current_state == UPGRADES:
-        draw_upgrades_menu()
-        draw_close_button()  # Keep close button in upgrades menu
+        with profiler.phase("draw_background"):
+            begin_screen(get_background("playing", build_playing_background))
+        with profiler.phase("draw_player"):
+            draw_player()
+        with profiler.phase("draw_items"):
+            draw_items()
+        with profiler.phase("draw_progress"):
+            draw_progress()
+        with profiler.phase("draw_close_button"):
+            draw_close_button()  # Keep close button in gameplay
+            mark_sprite(close_button_view)
+    
+    elif game.current_state == GAME_OVER:
+        with profiler.phase("show_end_screen"):
+            show_end_screen()
+    
+    elif game.current_state == UPGRADES:
+        with profiler.phase("draw_upgrades_menu"):
+            draw_upgrades_menu()
+            draw_close_widget()  # Keep close button in upgrades menu
+    
+    # Queue a save if a purchase or collection changed the profile
+    if profile_writer:
+        profile_writer.update(game)
     
     # Update display
-    pygame.display.flip()
-    
-    # Control game speed
-    clock.tick(60)
+    with profiler.phase("flip"):
+        if renderer:
+            renderer.flush_widgets()
+        if show_profiler:
+            draw_profiler_overlay()
+        if renderer:
+            renderer.present()
+        else:
+            if upscale:
+                pygame.transform.scale(screen, display.get_size(), display)
+            pygame.display.flip()
+    profiler.end_frame()
+    gc_control.update(game.current_state == PLAYING)
+    if alloc_probe:
+        alloc_probe.end_frame()
+    drawn = True
+    
+    if args.startup_benchmark:
+        # Report once the first frame is on screen, then quit
+        print(json.dumps({
+            "first_frame_ms": (time.perf_counter() - startup_start) * 1000,
+            "first_frame_time": time.time(),
+        }))
+        running = False
+    
+    if scenario_run and not scenario_run.record(time.perf_counter() - now):
+        print(json.dumps(scenario_run.report(game)))
+        running = False
+    
+    # Control render speed
+    clock.tick(frame_cap)
+
+# Write out any buffered events, timings and the profile
+if profile_writer:
+    profile_writer.close(game)
+if leaderboard_client:
+    leaderboard_client.close()
+telemetry.logger.close()
+if args.profile_out:
+    profiler.export(args.profile_out)
+if alloc_probe:
+    alloc_probe.export(args.trace_alloc)
+    alloc_probe.close()
+gc_control.close()
+if args.record:
+    recorder.save(args.record)
 
 # Quit pygame
 pygame.quit()
-sys.exit()
\ No newline at end of file
+sys.exit()
@@ -0,0 +1,215 @@
+import sys
+import time
+
+import numpy as np
+
+import simulation
+from simulation import (
+    GameState, Inputs, PLAYING, WIDTH, HEIGHT, player_width, player_height, player_y,
+    item_size, tick_rate,
+)
+from item_store import COLLECT
+
+# Gym-style environments for training bots. Actions are 0 (stay), 1 (left)
+# and 2 (right). An observation is the player's x followed by the x, y and
+# kind (+1 tower, -1 eagle, 0 empty slot) of the `slots` lowest items, all
+# scaled to roughly [0, 1]. Catching a tower is worth the currency it pays;
+# hitting an eagle ends the episode with a reward of -1.
+STAY = 0
+LEFT = 1
+RIGHT = 2
+ACTION_INPUTS = (Inputs(), Inputs(left=True), Inputs(right=True))
+
+
+def observation_size(slots):
+    return 1 + 3 * slots
+
+
+def _observe(out, player_x, xs, ys, kinds):
+    # Fill one observation row; xs, ys and kinds are already lowest first
+    out[0] = player_x / WIDTH
+    k = min(len(xs), (len(out) - 1) // 3)
+    items = out[1:].reshape(-1, 3)
+    items[:] = 0
+    items[:k, 0] = xs[:k] / WIDTH
+    items[:k, 1] = ys[:k] / HEIGHT
+    items[:k, 2] = kinds[:k]
+
+
+class PlaneEnv:
+    # One game driven through GameState, so it plays exactly like main.py
+    def __init__(self, seed=None, slots=8, max_ticks=tick_rate * 60 * 5, levels=(0, 0, 0, 0)):
+        self.seed = seed
+        self.slots = slots
+        self.max_ticks = max_ticks
+        self.levels = levels
+        self.game = None
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.seed = seed
+        self.game = GameState(self.seed)
+        speed, tower, eagle, currency = self.levels
+        self.game.speed_level = speed
+        self.game.tower_level = tower
+        self.game.eagle_level = eagle
+        self.game.currency_per_tower = currency + 1
+        self.game.player_speed = simulation.base_player_speed + speed * simulation.speed_per_level
+        self.game.start_game()
+        # Later resets continue from a new seed so episodes differ
+        if self.seed is not None:
+            self.seed += 1
+        return self.observe()
+
+    def observe(self):
+        game = self.game
+        n = game.items.count
+        obs = np.zeros(observation_size(self.slots), dtype=np.float32)
+        kinds = np.where(game.items.type[:n] == COLLECT, 1, -1)
+        _observe(obs, game.player_x, game.items.x[:n], game.items.y[:n], kinds)
+        return obs
+
+    def step(self, action):
+        game = self.game
+        before = game.collected_towers
+        game.step(ACTION_INPUTS[action])
+        reward = float(game.collected_towers - before)
+        if game.game_over:
+            reward -= 1.0
+        done = game.current_state != PLAYING or game.tick >= self.max_ticks
+        info = {"won": game.game_won, "ticks": game.tick, "collected": game.collected_towers}
+        return self.observe(), reward, done, info
+
+
+class VecPlaneEnv:
+    # `n` independent games stepped together. All state lives in NumPy
+    # arrays with one row per game and a fixed number of item slots per
+    # game, so a step costs a handful of array operations whatever `n` is.
+    # The rules follow GameState.step: move the player, spawn every
+    # spawn_rate ticks, move items, then collide. Games that finish are
+    # reset straight away; their final step still reports done and reward.
+    def __init__(self, n, seed=None, slots=8, max_ticks=tick_rate * 60 * 5, levels=(0, 0, 0, 0)):
+        self.n = n
+        self.slots = slots
+        self.max_ticks = max_ticks
+        self.rng = np.random.default_rng(seed)
+
+        # Upgrade levels, one row per game or one row for all of them
+        levels = np.broadcast_to(np.asarray(levels, dtype=np.int64), (n, 4))
+        speed, tower, eagle, currency = levels.T
+        self.player_speed = (simulation.base_player_speed + speed * simulation.speed_per_level).astype(np.float32)
+        self.currency_per_tower = (currency + 1).astype(np.float32)
+        chances = {}
+        self.tower_chance = np.empty(n)
+        for i, key in enumerate(zip(tower.tolist(), eagle.tolist())):
+            if key not in chances:
+                chances[key] = simulation.spawn_distribution(*key)[0]
+            self.tower_chance[i] = chances[key]
+
+        # Items are on screen for HEIGHT / item_speed ticks and one spawns
+        # every spawn_rate ticks
+        capacity = HEIGHT // simulation.item_speed // simulation.spawn_rate + 2
+        self.item_x = np.zeros((n, capacity), dtype=np.float32)
+        self.item_y = np.zeros((n, capacity), dtype=np.float32)
+        self.item_kind = np.zeros((n, capacity), dtype=np.float32)  # +1 tower, -1 eagle
+        self.alive = np.zeros((n, capacity), dtype=bool)
+        self.player_x = np.zeros(n, dtype=np.float32)
+        self.spawn_counter = np.zeros(n, dtype=np.int64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.collected = np.zeros(n, dtype=np.float32)
+        self.obs = np.zeros((n, observation_size(slots)), dtype=np.float32)
+
+    def _reset_rows(self, rows):
+        self.alive[rows] = False
+        self.player_x[rows] = WIDTH // 2 - player_width // 2
+        self.spawn_counter[rows] = 0
+        self.ticks[rows] = 0
+        self.collected[rows] = 0
+
+    def reset(self):
+        self._reset_rows(slice(None))
+        return self.observe()
+
+    def observe(self):
+        # Lowest items first, like ItemStore's row order
+        y = np.where(self.alive, self.item_y, -np.inf)
+        order = np.argsort(-y, axis=1)[:, :self.slots]
+
+        def take(column):
+            return np.take_along_axis(column, order, axis=1)
+
+        alive = take(self.alive)
+        obs = self.obs
+        obs[:, 0] = self.player_x / WIDTH
+        items = obs[:, 1:].reshape(self.n, -1, 3)
+        k = order.shape[1]
+        items[:, k:] = 0
+        items[:, :k, 0] = np.where(alive, take(self.item_x) / WIDTH, 0)
+        items[:, :k, 1] = np.where(alive, take(self.item_y) / HEIGHT, 0)
+        items[:, :k, 2] = np.where(alive, take(self.item_kind), 0)
+        return obs.copy()
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        self.ticks += 1
+
+        # Move the player
+        x = self.player_x
+        left = (actions == LEFT) & (x > 0)
+        x[left] -= self.player_speed[left]
+        right = (actions == RIGHT) & (x < WIDTH - player_width)
+        x[right] += self.player_speed[right]
+
+        # Spawn into the first free slot of every game that is due
+        self.spawn_counter += 1
+        due = np.flatnonzero(self.spawn_counter >= simulation.spawn_rate)
+        if len(due):
+            self.spawn_counter[due] = 0
+            slot = np.argmin(self.alive[due], axis=1)
+            rolls = self.rng.random(len(due))
+            self.item_x[due, slot] = self.rng.integers(20, WIDTH - 20, len(due), endpoint=True)
+            self.item_y[due, slot] = 0
+            self.item_kind[due, slot] = np.where(rolls < self.tower_chance[due], 1, -1)
+            self.alive[due, slot] = True
+
+        # Move items and drop the ones that fell off screen
+        self.item_y += simulation.item_speed
+        self.alive &= self.item_y <= HEIGHT
+
+        # Collide every live item with its game's plane
+        half = item_size // 2
+        ix = self.item_x - half
+        iy = self.item_y - half
+        px = x[:, None]
+        hit = (self.alive & (ix < px + player_width) & (ix + item_size > px)
+               & (iy < player_y + player_height) & (iy + item_size > player_y))
+        self.alive &= ~hit
+        towers = np.count_nonzero(hit & (self.item_kind > 0), axis=1)
+        eagles = np.count_nonzero(hit & (self.item_kind < 0), axis=1)
+
+        rewards = (towers * self.currency_per_tower).astype(np.float32)
+        self.collected += rewards
+        lost = eagles > 0
+        rewards[lost] -= 1.0
+        won = self.collected >= simulation.tower_goal
+        dones = lost | won | (self.ticks >= self.max_ticks)
+        infos = {"won": won & ~lost, "lost": lost, "ticks": self.ticks.copy(), "collected": self.collected.copy()}
+
+        finished = np.flatnonzero(dones)
+        if len(finished):
+            self._reset_rows(finished)
+        return self.observe(), rewards, dones, infos
+
+
+if __name__ == "__main__":
+    # Throughput with random actions
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    env = VecPlaneEnv(n, seed=0)
+    env.reset()
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for _ in range(steps):
+        env.step(rng.integers(0, 3, n))
+    elapsed = time.perf_counter() - start
+    print(f"{n} games x {steps} steps in {elapsed:.2f}s ({n * steps / elapsed:.0f} game ticks/sec)")
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import threading
+
+import telemetry
+from simulation import base_player_speed, speed_per_level
+
+# Progress that carries over between sessions
+PATH = "./profile.json"
+VERSION = 1
+FIELDS = (
+    "collected_towers", "speed_level", "tower_level", "eagle_level", "currency_per_tower",
+    "speed_cost", "tower_cost", "eagle_cost", "currency_boost_cost",
+)
+
+
+def snapshot(game):
+    return tuple(getattr(game, name) for name in FIELDS)
+
+
+def apply(game, values):
+    for name, value in zip(FIELDS, values):
+        setattr(game, name, value)
+    game.player_speed = base_player_speed + game.speed_level * speed_per_level
+    game.spawn_chances = None
+
+
+def _checksum(values):
+    return hashlib.sha256(json.dumps(list(values)).encode()).hexdigest()
+
+
+def load(path=PATH):
+    # Saved values in FIELDS order, or None if there is no usable save.
+    # A corrupt save is moved aside rather than overwritten.
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        data = None
+    try:
+        values = tuple(int(data["values"][name]) for name in FIELDS)
+        ok = data["version"] == VERSION and data["checksum"] == _checksum(values)
+    except (TypeError, KeyError, ValueError):
+        ok = False
+    if not ok:
+        telemetry.logger.log(telemetry.WARNING, "profile_corrupt", path=path)
+        try:
+            os.replace(path, path + ".corrupt")
+        except OSError:
+            pass
+        return None
+    return values
+
+
+def save(values, path=PATH):
+    # Write to a temporary file and rename it over the old save, so a crash
+    # mid-write leaves the previous save intact
+    data = {
+        "version": VERSION,
+        "values": dict(zip(FIELDS, values)),
+        "checksum": _checksum(values),
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ProfileWriter:
+    # Write-behind saving. update() is cheap enough to call every frame: it
+    # only compares a small tuple and, when something changed, hands the
+    # newest snapshot to a background thread. Snapshots that arrive while a
+    # write is in progress are coalesced into the next write.
+    def __init__(self, path=PATH, values=None):
+        self.path = path
+        self.saved = values
+        self.pending = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="profile", daemon=True)
+        self._thread.start()
+
+    def update(self, game):
+        values = snapshot(game)
+        if values == self.saved:
+            return
+        self.saved = values
+        with self._lock:
+            self.pending = values
+        self._wake.set()
+
+    def flush(self):
+        with self._lock:
+            values = self.pending
+            self.pending = None
+        if values is None:
+            return
+        try:
+            save(values, self.path)
+        except OSError as e:
+            telemetry.logger.log(telemetry.WARNING, "profile_save_failed", path=self.path, error=str(e))
+
+    def _run(self):
+        while not self._stop:
+            self._wake.wait()
+            self._wake.clear()
+            self.flush()
+
+    def close(self, game=None):
+        # Stop the thread and write whatever is pending, or the final state
+        # of game if given
+        if game is not None:
+            with self._lock:
+                self.pending = snapshot(game)
+        self._stop = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
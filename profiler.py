@@ -0,0 +1,98 @@
+import csv
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+class _Phase:
+    # Reusable timer so entering a phase doesn't allocate
+    __slots__ = ("samples", "start")
+
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples.append((time.perf_counter() - self.start) * 1000.0)
+        return False
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FrameProfiler:
+    # Times each phase of the main loop and keeps the last `window` samples
+    # per phase for rolling percentiles. All durations are in milliseconds.
+    def __init__(self, window=600):
+        self.window = window
+        self.phases = {}
+        self.frames = 0
+
+    def phase(self, name):
+        timer = self.phases.get(name)
+        if timer is None:
+            timer = self.phases[name] = _Phase(self.window)
+        return timer
+
+    def end_frame(self):
+        self.frames += 1
+
+    def stats(self):
+        rows = []
+        for name, timer in list(self.phases.items()):
+            if not timer.samples:
+                continue
+            samples = np.fromiter(timer.samples, dtype=np.float64, count=len(timer.samples))
+            p50, p95, p99 = np.percentile(samples, PERCENTILES)
+            rows.append({
+                "phase": name,
+                "samples": len(samples),
+                "mean_ms": float(samples.mean()),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "max_ms": float(samples.max()),
+            })
+        return rows
+
+    def export(self, path):
+        # Format is picked from the file extension: .json or .csv
+        rows = self.stats()
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"frames": self.frames, "phases": rows}, f, indent=2)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=["phase", "samples", "mean_ms", "p50_ms",
+                                                       "p95_ms", "p99_ms", "max_ms"])
+                writer.writeheader()
+                writer.writerows(rows)
+
+
+class NullProfiler:
+    # Stand-in used when profiling is off
+    _phase = _NullPhase()
+
+    def phase(self, name):
+        return self._phase
+
+    def end_frame(self):
+        pass
+
+
+null_profiler = NullProfiler()
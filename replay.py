@@ -0,0 +1,153 @@
+import argparse
+import hashlib
+import struct
+import sys
+import time
+
+import player_profile
+from simulation import PLAYING, GameState, Inputs, tick_time
+
+# File layout: header, the saved profile the session started from, record
+# bytes, then the SHA-256 of the final state
+MAGIC = b"PLRP"
+VERSION = 3
+HEADER = struct.Struct("<4sBQI")  # magic, version, seed, record byte count
+PROFILE = struct.Struct(f"<{len(player_profile.FIELDS)}i")
+
+# Record bytes. A byte with the high bit set is a run of ticks:
+#   1 LR nnnnn  -> (nnnnn + 1) ticks with LEFT/RIGHT held as L/R
+# Anything else is a game command.
+RUN_FLAG = 0x80
+MAX_RUN = 32
+COMMANDS = {
+    "start_game": 0x01,
+    "go_to_menu": 0x02,
+    "open_upgrades": 0x03,
+    "buy_speed": 0x10,
+    "buy_tower": 0x11,
+    "buy_eagle": 0x12,
+    "buy_currency": 0x13,
+}
+COMMAND_NAMES = {code: name for name, code in COMMANDS.items()}
+
+
+def state_hash(game):
+    # Everything that decides how the game plays out from here on. The win
+    # timestamp is wall-clock time and is left out.
+    h = hashlib.sha256()
+    h.update(struct.pack(
+        "<13i",
+        game.current_state, game.tick, game.collected_towers, game.game_over, game.game_won,
+        int(game.player_x), game.speed_level, game.tower_level, game.eagle_level,
+        game.currency_per_tower, game.speed_cost, game.tower_cost, game.eagle_cost,
+    ))
+    h.update(struct.pack("<ii", game.currency_boost_cost, game.spawn_counter))
+    n = game.items.count
+    h.update(game.items.x[:n].tobytes())
+    h.update(game.items.y[:n].tobytes())
+    h.update(game.items.type[:n].tobytes())
+    return h.digest()
+
+
+def apply_command(game, name):
+    if name.startswith("buy_"):
+        game.buy_upgrade(name[4:])
+    else:
+        getattr(game, name)()
+
+
+class Recorder:
+    # Drives a GameState and logs everything that changes it: one entry per
+    # simulation tick with the held keys, and the game command behind every
+    # click (start, upgrade purchase, back to menu). Clicks are stored as
+    # commands so a replay doesn't need the UI layout.
+    def __init__(self, game):
+        self.game = game
+        self.profile = player_profile.snapshot(game)
+        self.records = bytearray()
+        self.run_keys = None
+        self.run_length = 0
+
+    def step(self, inputs):
+        if self.game.current_state == PLAYING:
+            keys = (bool(inputs.left) << 1) | bool(inputs.right)
+            if keys != self.run_keys or self.run_length == MAX_RUN:
+                self._end_run()
+                self.run_keys = keys
+            self.run_length += 1
+        self.game.step(inputs)
+
+    def command(self, name):
+        self._end_run()
+        self.records.append(COMMANDS[name])
+        apply_command(self.game, name)
+
+    def buy_upgrade(self, upgrade_type):
+        self.command("buy_" + upgrade_type)
+
+    def _end_run(self):
+        if self.run_length:
+            self.records.append(RUN_FLAG | (self.run_keys << 5) | (self.run_length - 1))
+        self.run_keys = None
+        self.run_length = 0
+
+    def save(self, path):
+        self._end_run()
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.game.seed, len(self.records)))
+            f.write(PROFILE.pack(*self.profile))
+            f.write(self.records)
+            f.write(state_hash(self.game))
+
+
+def load(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, seed, length = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} replay")
+    profile = PROFILE.unpack_from(data, HEADER.size)
+    start = HEADER.size + PROFILE.size
+    records = data[start:start + length]
+    final_hash = data[start + length:start + length + 32]
+    return seed, profile, records, final_hash
+
+
+def replay(seed, records, profile=None):
+    # Re-run a log with no window, as fast as it will go
+    game = GameState(seed, clock=lambda: game.tick * tick_time)
+    if profile is not None:
+        player_profile.apply(game, profile)
+    idle = Inputs()
+    held = [idle, Inputs(right=True), Inputs(left=True), Inputs(left=True, right=True)]
+    step = game.step
+    for byte in records:
+        if byte & RUN_FLAG:
+            inputs = held[(byte >> 5) & 0x3]
+            for _ in range((byte & 0x1F) + 1):
+                step(inputs)
+        else:
+            apply_command(game, COMMAND_NAMES[byte])
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded session headlessly")
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    seed, profile, records, expected = load(args.path)
+    start = time.perf_counter()
+    game = replay(seed, records, profile)
+    elapsed = time.perf_counter() - start
+
+    ok = state_hash(game) == expected
+    print(f"{game.tick} ticks in {elapsed:.2f}s ({game.tick / max(elapsed, 1e-9):.0f} ticks/sec)")
+    print(f"towers={game.collected_towers} levels=({game.speed_level}, {game.tower_level}, "
+          f"{game.eagle_level}, {game.currency_per_tower - 1}) items={len(game.items)}")
+    print("final state matches" if ok else "FINAL STATE MISMATCH")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+import telemetry
+from profiler import null_profiler
+from item_store import ItemStore, COLLECT, AVOID, TYPE_NAMES
+
+# Screen dimensions
+WIDTH = 800
+HEIGHT = 600
+
+# Game states
+MENU = 0
+PLAYING = 1
+GAME_OVER = 2
+UPGRADES = 3
+
+# Simulation ticks per second. Speeds and spawn_rate are per tick, so
+# gameplay runs at the same pace whatever the render frame rate is.
+tick_rate = 60
+tick_time = 1.0 / tick_rate
+
+# Player (plane) properties
+player_width = 80  # Made bigger
+player_height = 60  # Made bigger
+player_y = HEIGHT - player_height - 20
+base_player_speed = 5  # Pixels per tick
+speed_per_level = 2  # Extra pixels per tick for each speed upgrade
+
+# Item properties
+item_size = 40  # Made bigger
+item_speed = 5  # Pixels per tick
+spawn_rate = 40  # Ticks between spawns
+
+# Upgrade settings
+max_upgrade_level = 5
+upgrade_cost_multiplier = 1.5  # Each level costs this much more than the last
+
+# Spawn chances - MODIFIED: default more eagles
+tower_chance = 0.2  # Default 20% chance for towers (was 0.3)
+tower_chance_per_level = 0.05  # Added tower chance per tower upgrade
+eagle_reduction_per_level = 0.1  # Removed eagle chance per eagle upgrade
+min_eagle_chance = 0.05  # Eagles never get rarer than this
+
+# Target for win condition
+tower_goal = 25  # Need to collect this many towers to win
+
+# Seconds the win screen stays up before returning to the menu
+win_screen_time = 5
+
+# Player input for a single simulation tick
+Inputs = namedtuple("Inputs", ["left", "right"], defaults=[False, False])
+
+
+def spawn_distribution(tower_level, eagle_level):
+    # Calculate adjusted tower chance based on tower level
+    adjusted_tower_chance = tower_chance + (tower_level * tower_chance_per_level)
+
+    # Calculate adjusted eagle reduction based on eagle level
+    eagle_reduction = eagle_level * eagle_reduction_per_level
+    adjusted_eagle_chance = 1.0 - adjusted_tower_chance - eagle_reduction
+
+    # Ensure we don't go below minimum eagle chance
+    if adjusted_eagle_chance < min_eagle_chance:
+        adjusted_eagle_chance = min_eagle_chance
+        adjusted_tower_chance = 1.0 - min_eagle_chance - adjusted_eagle_chance
+    return adjusted_tower_chance, adjusted_eagle_chance
+
+
+class SpawnStream:
+    # Random numbers for spawning, generated in NumPy blocks and handed out
+    # one item at a time: a uniform roll for the item type and an x position.
+    def __init__(self, seed=None, block=1024):
+        self.rng = np.random.default_rng(seed)
+        self.block = block
+        self.rolls = []
+        self.xs = []
+        self.index = 0
+
+    def refill(self):
+        self.rolls = self.rng.random(self.block).tolist()
+        self.xs = self.rng.integers(20, WIDTH - 20, size=self.block, endpoint=True).tolist()
+        self.index = 0
+
+    def next(self):
+        if self.index == len(self.rolls):
+            self.refill()
+        i = self.index
+        self.index = i + 1
+        return self.rolls[i], self.xs[i]
+
+
+class GameState:
+    # Everything the game needs to advance, with no dependency on a window.
+    # The pygame loop in main.py only reads from this and feeds it inputs.
+    def __init__(self, seed=None, logger=None, profiler=None, clock=time.time):
+        self.seed = seed
+        self.spawns = SpawnStream(seed)
+        self.spawn_chances = None  # Cached for the current upgrade levels
+        self.clock = clock
+        self.logger = logger or telemetry.logger
+        self.profiler = profiler or null_profiler
+        self.current_state = MENU
+        self.tick = 0
+
+        # Game variables
+        self.collected_towers = 0  # New currency for upgrades
+        self.game_over = False
+        self.game_won = False
+        self.win_time = 0  # For tracking the win screen timer
+        self.run_towers = 0  # Towers caught in the current run
+        self.run_start_tick = 0
+
+        self.player_x = WIDTH // 2 - player_width // 2
+        self.prev_player_x = self.player_x
+        self.player_speed = base_player_speed
+
+        # Upgrade variables
+        self.speed_level = 0
+        self.tower_level = 0
+        self.eagle_level = 0
+        self.currency_per_tower = 1  # New currency per collection
+        self.speed_cost = 5  # Reduced costs to match new currency
+        self.tower_cost = 3
+        self.eagle_cost = 4
+        self.currency_boost_cost = 5  # Cost for boosting currency per tower
+
+        # Items and obstacles
+        self.items = ItemStore()
+        self.spawn_counter = 0
+
+    def step(self, inputs=Inputs()):
+        # Advance one frame of gameplay. Does nothing outside of PLAYING.
+        if self.current_state != PLAYING:
+            return
+        self.tick += 1
+        self.prev_player_x = self.player_x
+        profiler = self.profiler
+
+        with profiler.phase("move_player"):
+            if inputs.left and self.player_x > 0:
+                self.player_x -= self.player_speed
+            if inputs.right and self.player_x < WIDTH - player_width:
+                self.player_x += self.player_speed
+
+        # Spawn new items
+        with profiler.phase("spawn"):
+            self.spawn_counter += 1
+            if self.spawn_counter >= spawn_rate:
+                self.create_item()
+                self.spawn_counter = 0
+
+        # Move items and check collisions
+        with profiler.phase("move_items"):
+            self.move_items()
+        with profiler.phase("check_collisions"):
+            self.check_collisions()
+
+    def get_spawn_chances(self):
+        # Only changes when an upgrade is bought, so it is worked out once
+        # per (tower_level, eagle_level) and dropped by buy_upgrade
+        if self.spawn_chances is None:
+            self.spawn_chances = spawn_distribution(self.tower_level, self.eagle_level)
+        return self.spawn_chances
+
+    def create_item(self):
+        adjusted_tower_chance, adjusted_eagle_chance = self.get_spawn_chances()
+
+        # Determine item type based on adjusted chances
+        rand_val, item_x = self.spawns.next()
+        item_type = COLLECT if rand_val < adjusted_tower_chance else AVOID
+        self.items.append(item_x, 0, item_type)
+
+        # For debugging
+        self.logger.log(telemetry.DEBUG, "spawn", tick=self.tick, type=TYPE_NAMES[item_type], x=item_x,
+                        roll=rand_val, tower_chance=adjusted_tower_chance,
+                        eagle_chance=adjusted_eagle_chance)
+
+    def move_items(self):
+        # Move every item and remove those that fall off screen in one pass
+        self.items.move(item_speed, HEIGHT)
+
+    def check_collisions(self):
+        hits = self.items.collide_rect(self.player_x, player_y, player_width, player_height, item_size)
+        if len(hits) == 0:
+            return
+        hit_types = self.items.type[hits].tolist()
+        self.items.remove(hits)
+
+        for item_type in hit_types:
+            if item_type == COLLECT:
+                # Add currency based on currency_per_tower
+                self.collected_towers += self.currency_per_tower
+                self.run_towers += 1
+                if self.collected_towers >= tower_goal:
+                    self.game_won = True
+                    self.win_time = self.clock()
+                    self.current_state = GAME_OVER
+            else:
+                self.game_over = True
+                self.current_state = GAME_OVER
+            self.logger.log(telemetry.DEBUG, "collision", tick=self.tick, type=TYPE_NAMES[item_type],
+                            collected_towers=self.collected_towers)
+
+    def can_buy(self, upgrade_type):
+        if upgrade_type == "speed":
+            return self.speed_level < max_upgrade_level and self.collected_towers >= self.speed_cost
+        if upgrade_type == "tower":
+            return self.tower_level < max_upgrade_level and self.collected_towers >= self.tower_cost
+        if upgrade_type == "eagle":
+            return self.eagle_level < max_upgrade_level and self.collected_towers >= self.eagle_cost
+        if upgrade_type == "currency":
+            return self.currency_per_tower-1 < max_upgrade_level and self.collected_towers >= self.currency_boost_cost
+        return False
+
+    def buy_upgrade(self, upgrade_type):
+        if not self.can_buy(upgrade_type):
+            return False
+        self.spawn_chances = None
+
+        if upgrade_type == "speed":
+            self.collected_towers -= self.speed_cost
+            self.speed_level += 1
+            self.player_speed = base_player_speed + (self.speed_level * speed_per_level)
+            self.speed_cost = int(self.speed_cost * upgrade_cost_multiplier)  # Increase cost for next level
+
+        elif upgrade_type == "tower":
+            self.collected_towers -= self.tower_cost
+            self.tower_level += 1
+            self.tower_cost = int(self.tower_cost * upgrade_cost_multiplier)  # Increase cost for next level
+
+        elif upgrade_type == "eagle":
+            self.collected_towers -= self.eagle_cost
+            self.eagle_level += 1
+            self.eagle_cost = int(self.eagle_cost * upgrade_cost_multiplier)  # Increase cost for next level
+
+        elif upgrade_type == "currency":
+            self.collected_towers -= self.currency_boost_cost
+            self.currency_per_tower += 1  # Each level adds +1 currency per collection
+            self.currency_boost_cost = int(self.currency_boost_cost * upgrade_cost_multiplier)  # Increase cost for next level
+        return True
+
+    def win_time_remaining(self, now=None):
+        if now is None:
+            now = self.clock()
+        return win_screen_time - (now - self.win_time)
+
+    def reset_game(self):
+        # Don't reset collected_towers when going back to menu
+        # So player keeps their upgrade currency
+        self.game_over = False
+        self.game_won = False
+        self.run_towers = 0
+        self.items.clear()
+        self.player_x = WIDTH // 2 - player_width // 2
+        self.prev_player_x = self.player_x
+
+    def start_game(self):
+        self.reset_game()
+        self.run_start_tick = self.tick
+        self.current_state = PLAYING
+
+    def go_to_menu(self):
+        self.reset_game()
+        self.current_state = MENU
+
+    def open_upgrades(self):
+        self.current_state = UPGRADES
+
+    def render_player_x(self, alpha):
+        # Player position `alpha` of the way from the previous tick to this one
+        return self.prev_player_x + (self.player_x - self.prev_player_x) * alpha
+
+    def render_item_offset(self, alpha):
+        # Items all fall at item_speed, so their previous position is exact
+        return -item_speed * (1.0 - alpha)
+
+
+class FixedTimestep:
+    # Turns real elapsed time into a whole number of simulation ticks.
+    # Leftover time is carried to the next frame and exposed as `alpha` for
+    # interpolating between the last two ticks. If the game falls too far
+    # behind, at most `max_steps` ticks run and the backlog is dropped
+    # rather than spiralling.
+    def __init__(self, step_time=tick_time, max_steps=5):
+        self.step_time = step_time
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.alpha = 0.0
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.alpha = 0.0
+
+    def advance(self, elapsed):
+        self.accumulator += elapsed
+        steps = int(self.accumulator / self.step_time)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step_time
+        self.alpha = self.accumulator / self.step_time
+        return steps
+
+
+def run_headless(ticks, seed=None, policy=None):
+    # Play `ticks` frames with no window, restarting after every game over.
+    # `policy(game)` returns the Inputs for the next tick.
+    game = GameState(seed)
+    game.start_game()
+    for _ in range(ticks):
+        if game.current_state != PLAYING:
+            game.start_game()
+        game.step(policy(game) if policy else Inputs())
+    return game
+
+
+if __name__ == "__main__":
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    start = time.perf_counter()
+    run_headless(ticks, seed=0)
+    elapsed = time.perf_counter() - start
+    print(f"{ticks} ticks in {elapsed:.2f}s ({ticks / elapsed:.0f} ticks/sec)")
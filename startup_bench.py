@@ -0,0 +1,67 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+
+def measure(extra_args, env):
+    # Launch the game once and return (process launch to first frame,
+    # in-process time to first frame), both in milliseconds
+    launch = time.time()
+    result = subprocess.run(
+        [sys.executable, "main.py", "--startup-benchmark"] + extra_args,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True, check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return (report["first_frame_time"] - launch) * 1000, report["first_frame_ms"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time to first frame of the game")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--headless", action="store_true", help="use SDL's dummy video driver")
+    parser.add_argument("--label", default="", help="tag stored with the result, e.g. a release")
+    parser.add_argument("--history", help="append the result to this JSONL file")
+    args, extra_args = parser.parse_known_args()
+
+    env = dict(os.environ)
+    if args.headless:
+        env["SDL_VIDEODRIVER"] = "dummy"
+
+    launch_ms = []
+    in_process_ms = []
+    for _ in range(args.runs):
+        total, in_process = measure(extra_args, env)
+        launch_ms.append(total)
+        in_process_ms.append(in_process)
+
+    launch_ms = np.array(launch_ms)
+    in_process_ms = np.array(in_process_ms)
+    result = {
+        "label": args.label,
+        "time": time.time(),
+        "runs": args.runs,
+        "launch_to_first_frame_ms": {
+            "min": float(launch_ms.min()),
+            "p50": float(np.percentile(launch_ms, 50)),
+            "p90": float(np.percentile(launch_ms, 90)),
+        },
+        "in_process_to_first_frame_ms": {
+            "min": float(in_process_ms.min()),
+            "p50": float(np.percentile(in_process_ms, 50)),
+            "p90": float(np.percentile(in_process_ms, 90)),
+        },
+    }
+    print(json.dumps(result, indent=2))
+    if args.history:
+        with open(args.history, "a") as f:
+            f.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+from collections import deque
+
+# Log levels, lowest is most verbose
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "off": OFF}
+
+
+class EventLogger:
+    # Structured event log that stays out of the frame. log() only appends a
+    # small tuple to an in-memory ring buffer; a background thread drains the
+    # buffer and writes JSONL in batches. Logging is off by default. When the
+    # buffer overflows, the oldest events are lost and a "dropped" record
+    # with their count is written in their place.
+    def __init__(self, level=OFF, path=None, capacity=8192, flush_interval=0.5):
+        self.level = level
+        self.path = path
+        self.flush_interval = flush_interval
+        self.buffer = deque(maxlen=capacity)
+        self.dropped = 0
+        self._wake = threading.Event()
+        self._stop = False
+        self._thread = None
+
+    def configure(self, level=None, path=None):
+        if level is not None:
+            self.level = level
+        if path is not None:
+            self.path = path
+        if self.level < OFF and self.path and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+            self._thread.start()
+
+    def log(self, level, event, **fields):
+        if level < self.level:
+            return
+        buffer = self.buffer
+        if len(buffer) == buffer.maxlen:
+            self.dropped += 1
+        buffer.append((time.time(), level, event, fields))
+        if len(buffer) * 2 >= buffer.maxlen:
+            self._wake.set()
+
+    def drain(self):
+        records = []
+        buffer = self.buffer
+        while buffer:
+            records.append(buffer.popleft())
+        return records
+
+    def flush(self):
+        records = self.drain()
+        if not records or not self.path:
+            return
+        dropped = self.dropped
+        if dropped:
+            # log() may drop more while this runs; those go in the next flush
+            self.dropped -= dropped
+            records.insert(0, (records[0][0], WARNING, "dropped", {"count": dropped}))
+        lines = []
+        for timestamp, level, event, fields in records:
+            record = {"t": round(timestamp, 6), "level": level, "event": event}
+            record.update(fields)
+            lines.append(json.dumps(record, separators=(",", ":")))
+        with open(self.path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def _run(self):
+        while not self._stop:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        self._stop = True
+        if self._thread is not None:
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+# Shared logger used by the game
+logger = EventLogger()
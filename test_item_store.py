@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from item_store import ItemStore, COLLECT, AVOID
+from simulation import HEIGHT, item_size, item_speed, player_y, player_width, player_height
+
+
+def random_stores(rng):
+    # The same items twice: one store uses the sorted fast paths, the other
+    # the full scans. Rows are sorted by descending y like in the game; y
+    # sits on the item_speed grid most of the time so items land exactly on
+    # band edges, with the odd fractional value mixed in.
+    n = int(rng.integers(0, 40))
+    if rng.random() < 0.5:
+        ys = rng.integers(-4, HEIGHT // item_speed + 4, n) * item_speed
+    else:
+        ys = rng.uniform(-20, HEIGHT + 20, n)
+    ys = np.sort(ys)[::-1]
+    xs = rng.integers(0, 800, n)
+    types = rng.choice((COLLECT, AVOID), n)
+    stores = []
+    for sorted_ in (True, False):
+        store = ItemStore(capacity=4)
+        for x, y, item_type in zip(xs.tolist(), ys.tolist(), types.tolist()):
+            store.append(x, y, item_type)
+        assert store.sorted
+        store.sorted = sorted_
+        stores.append(store)
+    return stores
+
+
+def live(store):
+    n = store.count
+    return store.x[:n].tolist(), store.y[:n].tolist(), store.type[:n].tolist()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_collide_rect_matches_full_scan(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(100):
+        fast, full = random_stores(rng)
+        if rng.random() < 0.5:
+            rect = (int(rng.integers(0, 800 - player_width)), player_y, player_width, player_height)
+        else:
+            rect = tuple(int(v) for v in rng.integers(-50, 650, 2)) + tuple(int(v) for v in rng.integers(1, 200, 2))
+        expected = full.collide_rect(*rect, item_size)
+        assert fast.collide_rect(*rect, item_size).tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_move_matches_full_scan(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(100):
+        fast, full = random_stores(rng)
+        for _ in range(int(rng.integers(1, 5))):
+            fast.move(item_speed, HEIGHT)
+            full.move(item_speed, HEIGHT)
+            assert live(fast) == live(full)
+
+
+def test_append_out_of_order_falls_back_to_full_scan():
+    store = ItemStore()
+    store.append(100, 50, COLLECT)
+    store.append(100, 80, AVOID)
+    assert not store.sorted
+    store.move(item_speed, 60)
+    assert live(store) == ([100.0], [55.0], [COLLECT])
+    store.clear()
+    assert store.sorted
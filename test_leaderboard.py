@@ -0,0 +1,208 @@
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+import leaderboard
+from leaderboard import LeaderboardClient, StubHandler, StubServer
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def start_server(handler=StubHandler, port=0):
+    server = StubServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stop_server(server):
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / "queue.jsonl")
+
+
+def make_client(url, queue_path, **kwargs):
+    options = {"batch_interval": 0.05, "timeout": 2.0, "retry_delay": 0.1, "max_retry_delay": 0.2}
+    options.update(kwargs)
+    return LeaderboardClient(url, queue_path, **options)
+
+
+def scores(n, prefix="run"):
+    return [{"run_id": f"{prefix}{i}", "duration": float(i)} for i in range(n)]
+
+
+def read_queue(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_batches_share_one_connection(queue_path):
+    server = start_server()
+    client = make_client(server.url, queue_path, batch_interval=0.2)
+    try:
+        for score in scores(45):
+            client.submit(score)
+        assert wait_for(lambda: len(server.scores) == 45)
+        assert client.sent == 45
+        assert [size for _, size in server.posts] == [20, 20, 5]
+        assert len({address for address, _ in server.posts}) == 1
+    finally:
+        client.close()
+        stop_server(server)
+    assert not os.path.exists(queue_path)
+
+
+def test_offline_scores_are_queued_and_sent_next_start(queue_path):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/scores"
+    client = make_client(url, queue_path)
+    for score in scores(3):
+        client.submit(score)
+    assert wait_for(lambda: os.path.exists(queue_path))
+    client.submit({"run_id": "late"})
+    time.sleep(0.1)
+    client.close()
+    assert [score["run_id"] for score in read_queue(queue_path)] == ["run0", "run1", "run2", "late"]
+
+    server = start_server(port=port)
+    client = make_client(url, queue_path)
+    try:
+        assert wait_for(lambda: len(server.scores) == 4)
+        assert wait_for(lambda: not os.path.exists(queue_path))
+    finally:
+        client.close()
+        stop_server(server)
+
+
+def test_server_coming_back_drains_the_queue(queue_path):
+    port = free_port()
+    client = make_client(f"http://127.0.0.1:{port}/scores", queue_path)
+    try:
+        for score in scores(5):
+            client.submit(score)
+        assert wait_for(lambda: os.path.exists(queue_path))
+        server = start_server(port=port)
+        try:
+            assert wait_for(lambda: len(server.scores) == 5)
+            assert wait_for(lambda: not os.path.exists(queue_path))
+        finally:
+            stop_server(server)
+    finally:
+        client.close()
+
+
+class NoContentHandler(StubHandler):
+    def _reply(self, status, payload):
+        self.send_response(204)
+        self.end_headers()
+
+
+class ChunkedHandler(StubHandler):
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        half = len(body) // 2
+        for chunk in (body[:half], body[half:]):
+            self.wfile.write(b"%x;ext=1\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\nX-Trailer: yes\r\n\r\n")
+
+
+@pytest.mark.parametrize("handler", [NoContentHandler, ChunkedHandler])
+def test_bodiless_and_chunked_replies_keep_the_connection(queue_path, handler):
+    server = start_server(handler)
+    client = make_client(server.url, queue_path)
+    try:
+        client.submit({"run_id": "a"})
+        assert wait_for(lambda: client.sent == 1, timeout=1.0)
+        client.submit({"run_id": "b"})
+        assert wait_for(lambda: client.sent == 2, timeout=1.0)
+        # Each batch is posted exactly once, over the same connection
+        time.sleep(0.2)
+        assert [size for _, size in server.posts] == [1, 1]
+        assert len({address for address, _ in server.posts}) == 1
+    finally:
+        client.close()
+        stop_server(server)
+    assert not os.path.exists(queue_path)
+
+
+class RedirectHandler(StubHandler):
+    def _reply(self, status, payload):
+        self.send_response(301)
+        self.send_header("Location", "https://example.invalid/scores")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+def test_redirect_keeps_scores_queued(queue_path):
+    server = start_server(RedirectHandler)
+    client = make_client(server.url, queue_path)
+    try:
+        client.submit({"run_id": "a"})
+        assert wait_for(lambda: len(server.posts) >= 2)
+        assert client.sent == 0
+    finally:
+        client.close()
+        stop_server(server)
+    assert [score["run_id"] for score in read_queue(queue_path)] == ["a"]
+
+
+class RejectHandler(StubHandler):
+    def _reply(self, status, payload):
+        super()._reply(422, {"error": "bad score"})
+
+
+def test_rejected_scores_are_dropped(queue_path):
+    server = start_server(RejectHandler)
+    client = make_client(server.url, queue_path)
+    try:
+        client.submit({"run_id": "a"})
+        assert wait_for(lambda: len(server.posts) == 1)
+        time.sleep(0.3)
+        assert len(server.posts) == 1
+        assert client.sent == 0
+    finally:
+        client.close()
+        stop_server(server)
+    assert not os.path.exists(queue_path)
+
+
+def test_corrupt_queue_lines_are_skipped(queue_path):
+    with open(queue_path, "w") as f:
+        f.write('{"run_id": "a"}\nnot json\n\n{"run_id": "b"}\n')
+    assert leaderboard.OfflineQueue(queue_path).load() == [{"run_id": "a"}, {"run_id": "b"}]
+
+
+def test_servers_keep_their_own_scores(queue_path):
+    first, second = start_server(), start_server()
+    client = make_client(first.url, queue_path)
+    try:
+        client.submit({"run_id": "a"})
+        assert wait_for(lambda: len(first.scores) == 1)
+        assert second.scores == {}
+    finally:
+        client.close()
+        stop_server(first)
+        stop_server(second)
@@ -0,0 +1,84 @@
+import json
+import os
+
+import pytest
+
+import player_profile
+from simulation import GameState, base_player_speed, speed_per_level
+
+VALUES = (42, 2, 1, 3, 2, 11, 4, 13, 7)
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / "profile.json")
+    player_profile.save(VALUES, path)
+    assert player_profile.load(path) == VALUES
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_missing_file_is_a_fresh_start(tmp_path):
+    path = str(tmp_path / "profile.json")
+    assert player_profile.load(path) is None
+    assert not os.path.exists(path + ".corrupt")
+
+
+def tamper_value(data):
+    data["values"]["collected_towers"] += 100
+
+
+def tamper_version(data):
+    data["version"] += 1
+
+
+def tamper_missing_field(data):
+    del data["values"]["speed_level"]
+
+
+def tamper_not_a_number(data):
+    data["values"]["tower_cost"] = "lots"
+
+
+@pytest.mark.parametrize("tamper", [tamper_value, tamper_version, tamper_missing_field, tamper_not_a_number])
+def test_tampered_save_is_moved_aside(tmp_path, tamper):
+    path = str(tmp_path / "profile.json")
+    player_profile.save(VALUES, path)
+    with open(path) as f:
+        data = json.load(f)
+    tamper(data)
+    with open(path, "w") as f:
+        json.dump(data, f)
+    assert player_profile.load(path) is None
+    assert not os.path.exists(path)
+    with open(path + ".corrupt") as f:
+        assert json.load(f) == data
+
+
+@pytest.mark.parametrize("content", ["", "{\"version\": 1, \"values\"", "[1, 2, 3]", "null"])
+def test_unreadable_save_is_moved_aside(tmp_path, content):
+    path = str(tmp_path / "profile.json")
+    with open(path, "w") as f:
+        f.write(content)
+    assert player_profile.load(path) is None
+    assert not os.path.exists(path)
+    assert os.path.exists(path + ".corrupt")
+
+
+def test_apply_restores_derived_state():
+    game = GameState(0)
+    game.get_spawn_chances()
+    player_profile.apply(game, VALUES)
+    assert player_profile.snapshot(game) == VALUES
+    assert game.player_speed == base_player_speed + 2 * speed_per_level
+    assert game.spawn_chances is None
+
+
+def test_writer_saves_final_state_on_close(tmp_path):
+    path = str(tmp_path / "profile.json")
+    game = GameState(0)
+    writer = player_profile.ProfileWriter(path, player_profile.snapshot(game))
+    game.collected_towers = 9
+    writer.update(game)
+    game.collected_towers = 5
+    game.speed_level = 1
+    writer.close(game)
+    assert player_profile.load(path)[:2] == (5, 1)
@@ -0,0 +1,35 @@
+import json
+
+import telemetry
+
+
+def read_events(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_overflow_writes_a_dropped_record(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    logger = telemetry.EventLogger(level=telemetry.DEBUG, path=path, capacity=4)
+    for i in range(10):
+        logger.log(telemetry.DEBUG, "spawn", i=i)
+    logger.flush()
+    events = read_events(path)
+    assert events[0]["event"] == "dropped"
+    assert events[0]["count"] == 6
+    assert events[0]["level"] == telemetry.WARNING
+    assert [event["i"] for event in events[1:]] == [6, 7, 8, 9]
+    assert logger.dropped == 0
+
+    logger.log(telemetry.INFO, "spawn", i=10)
+    logger.flush()
+    assert [event["event"] for event in read_events(path)[5:]] == ["spawn"]
+
+
+def test_events_below_level_are_skipped(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    logger = telemetry.EventLogger(level=telemetry.INFO, path=path)
+    logger.log(telemetry.DEBUG, "spawn")
+    logger.log(telemetry.WARNING, "profile_corrupt", path="x")
+    logger.close()
+    assert [event["event"] for event in read_events(path)] == ["profile_corrupt"]
@@ -0,0 +1,36 @@
+from collections import OrderedDict
+
+
+class TextCache:
+    # Rendered text surfaces keyed by (font, text, antialias, color). Static
+    # labels are rasterized once; changing strings such as counters only get
+    # re-rendered when their content changes. Least recently used entries
+    # are evicted once `max_size` is reached.
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, antialias, color):
+        key = (font, text, antialias, tuple(color))
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        surf = font.render(text, antialias, color)
+        self.surfaces[key] = surf
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+# Shared cache used by all screens
+text_cache = TextCache()
+render_text = text_cache.render
@@ -0,0 +1,225 @@
+import argparse
+import itertools
+import json
+import os
+import time
+from functools import lru_cache
+from multiprocessing import Pool
+
+import simulation
+from simulation import GameState, PLAYING, max_upgrade_level, tick_rate
+from balance import POLICIES, UPGRADES
+
+# Upgrade levels are tuples in UPGRADES order: (speed, tower, eagle, currency)
+START = (0, 0, 0, 0)
+
+
+class EventCounter:
+    # Stands in for the telemetry logger and counts spawns and collisions
+    def __init__(self):
+        self.spawned = {"collect": 0, "avoid": 0}
+        self.hit = {"collect": 0, "avoid": 0}
+
+    def log(self, level, event, **fields):
+        if event == "spawn":
+            self.spawned[fields["type"]] += 1
+        elif event == "collision":
+            self.hit[fields["type"]] += 1
+
+
+def calibrate(speed_level, ticks, seed=0, policy="seek"):
+    # How the bot does at one speed level: the fraction of towers it
+    # catches and the fraction of eagles that end its run. Runs restart
+    # straight away after a win or a loss.
+    counter = EventCounter()
+    game = GameState(seed, logger=counter)
+    game.speed_level = speed_level
+    game.player_speed = simulation.base_player_speed + speed_level * simulation.speed_per_level
+    policy = POLICIES[policy]
+    game.start_game()
+    for _ in range(ticks):
+        game.step(policy(game))
+        if game.current_state != PLAYING:
+            game.collected_towers = 0
+            game.start_game()
+    return {
+        "catch_rate": counter.hit["collect"] / max(counter.spawned["collect"], 1),
+        "hit_rate": counter.hit["avoid"] / max(counter.spawned["avoid"], 1),
+    }
+
+
+def _calibrate(job):
+    return calibrate(*job)
+
+
+def calibrate_all(ticks, seed=0, policy="seek", workers=None):
+    jobs = [(level, ticks, seed + level, policy) for level in range(max_upgrade_level + 1)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [_calibrate(job) for job in jobs]
+    with Pool(min(workers, len(jobs))) as pool:
+        return pool.map(_calibrate, jobs)
+
+
+def upgrade_costs():
+    # costs[i][level] is the price of taking UPGRADES[i] from level to level + 1
+    game = GameState()
+    base = (game.speed_cost, game.tower_cost, game.eagle_cost, game.currency_boost_cost)
+    costs = []
+    for cost in base:
+        row = []
+        for _ in range(max_upgrade_level):
+            row.append(cost)
+            cost = int(cost * simulation.upgrade_cost_multiplier)
+        costs.append(row)
+    return costs
+
+
+class Solver:
+    # Expected-value model of the economy. At upgrade levels L the player
+    # earns `currency_per_tower` per caught tower, and a caught tower takes
+    # ticks_per_collection(L) on average, including restarts after eagle
+    # hits. Currency moves in whole steps, so each purchase policy follows
+    # one path through (levels, currency) states, and the expected time to
+    # the goal is the sum of the expected times along that path. Results are
+    # memoized per state, so the whole state space is solved once.
+    def __init__(self, rates, restart_ticks, goal=None):
+        self.rates = rates
+        self.restart_ticks = restart_ticks
+        self.goal = goal or simulation.tower_goal
+        self.costs = upgrade_costs()
+        self.ticks_per_collection = lru_cache(maxsize=None)(self._ticks_per_collection)
+        self.best = lru_cache(maxsize=None)(self._best)
+        self.follow = lru_cache(maxsize=None)(self._follow)
+
+    def _ticks_per_collection(self, levels):
+        speed, tower, eagle, _ = levels
+        tower_chance, eagle_chance = simulation.spawn_distribution(tower, eagle)
+        rate = self.rates[speed]
+        # Per spawn: towers caught, and eagle hits that cost a restart
+        caught = tower_chance * rate["catch_rate"]
+        hits = eagle_chance * rate["hit_rate"]
+        if caught <= 0:
+            return float("inf")
+        return (simulation.spawn_rate + hits * self.restart_ticks) / caught
+
+    def cost(self, levels, i):
+        if levels[i] >= max_upgrade_level:
+            return None
+        return self.costs[i][levels[i]]
+
+    def collect(self, levels, currency):
+        # Value of catching one more tower: (ticks, next currency or None if won)
+        currency += levels[3] + 1
+        return self.ticks_per_collection(levels), (None if currency >= self.goal else currency)
+
+    def _best(self, levels, currency):
+        # (expected ticks, collections, purchases) to reach the goal from
+        # this state with the best choice at every step
+        ticks, after = self.collect(levels, currency)
+        if after is None:
+            best = (ticks, 1, ())
+        else:
+            rest = self.best(levels, after)
+            best = (ticks + rest[0], rest[1] + 1, rest[2])
+        for i, name in enumerate(UPGRADES):
+            cost = self.cost(levels, i)
+            if cost is None or cost > currency:
+                continue
+            upgraded = levels[:i] + (levels[i] + 1,) + levels[i + 1:]
+            rest = self.best(upgraded, currency - cost)
+            if rest[0] < best[0]:
+                best = (rest[0], rest[1], ((name, currency),) + rest[2])
+        return best
+
+    def _follow(self, levels, currency, order):
+        # Like best(), but buying the upgrades in `order` as soon as each is
+        # affordable and nothing else
+        if order:
+            i = UPGRADES.index(order[0])
+            cost = self.cost(levels, i)
+            if cost is not None and cost <= currency:
+                upgraded = levels[:i] + (levels[i] + 1,) + levels[i + 1:]
+                rest = self.follow(upgraded, currency - cost, order[1:])
+                return rest[0], rest[1], ((order[0], currency),) + rest[2]
+        ticks, after = self.collect(levels, currency)
+        if after is None:
+            return ticks, 1, ()
+        rest = self.follow(levels, after, order)
+        return ticks + rest[0], rest[1] + 1, rest[2]
+
+
+def purchase_orders(max_length):
+    # Every sequence of up to max_length purchases that respects the level cap
+    for length in range(max_length + 1):
+        for order in itertools.product(UPGRADES, repeat=length):
+            if all(order.count(name) <= max_upgrade_level for name in UPGRADES):
+                yield order
+
+
+def describe(result):
+    ticks, collections, purchases = result
+    return {
+        "expected_seconds": ticks / tick_rate,
+        "collections": collections,
+        "purchases": [{"upgrade": name, "at_currency": currency} for name, currency in purchases],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Expected time to tower_goal for every upgrade purchase order")
+    parser.add_argument("--policy", choices=POLICIES, default="seek",
+                        help="bot used to measure catch and hit rates per speed level")
+    parser.add_argument("--calibration-ticks", type=int, default=30000,
+                        help="ticks played at each speed level to measure the bot")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--restart-seconds", type=float, default=2.0,
+                        help="time lost to getting back into a run after an eagle hit")
+    parser.add_argument("--max-length", type=int, default=6,
+                        help="longest purchase order to enumerate")
+    parser.add_argument("--top", type=int, default=10, help="orders to print")
+    parser.add_argument("--out", help="write every order's result as JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rates = calibrate_all(args.calibration_ticks, args.seed, args.policy, args.workers)
+    calibrated = time.perf_counter()
+    solver = Solver(rates, args.restart_seconds * tick_rate)
+
+    # Orders that only differ in purchases never reached play out the same;
+    # keep one entry per sequence actually bought
+    results = {}
+    for order in purchase_orders(args.max_length):
+        result = solver.follow(START, 0, order)
+        bought = tuple(name for name, _ in result[2])
+        results.setdefault(bought, result)
+    ranked = sorted(results.values(), key=lambda result: result[0])
+    optimal = solver.best(START, 0)
+    solved = time.perf_counter()
+
+    print("speed level  catch rate  hit rate")
+    for level, rate in enumerate(rates):
+        print(f"{level:>11}  {rate['catch_rate']:>10.3f}  {rate['hit_rate']:>8.3f}")
+    print()
+    print(f"{'seconds':>8}  {'towers':>6}  purchases (currency when bought)")
+    for result in ranked[:args.top]:
+        purchases = ", ".join(f"{name}@{currency}" for name, currency in result[2]) or "none"
+        print(f"{result[0] / tick_rate:>8.1f}  {result[1]:>6}  {purchases}")
+    print()
+    purchases = ", ".join(f"{name}@{currency}" for name, currency in optimal[2]) or "none"
+    print(f"optimal: {optimal[0] / tick_rate:.1f}s, {optimal[1]} towers, {purchases}")
+    print(f"{len(results)} distinct orders, {solver.best.cache_info().currsize} states in the optimal solve; "
+          f"calibration {calibrated - start:.1f}s, solve {solved - calibrated:.2f}s")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({
+                "rates": rates,
+                "optimal": describe(optimal),
+                "orders": [describe(result) for result in ranked],
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
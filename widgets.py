@@ -0,0 +1,103 @@
+import pygame
+
+from text_cache import render_text
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+DARK_GRAY = (80, 80, 80)
+
+# Button states, each with its own cached surface
+NORMAL = 0
+HOVER = 1
+DISABLED = 2
+
+
+class Button:
+    # Retained-mode button. The rounded body, border and label are
+    # composited into one surface per state the first time that state is
+    # drawn and reused until the label changes. A button can be bound to a
+    # function returning (text, enabled); update() calls it and only throws
+    # the cached surfaces away when the result differs. Geometry is given
+    # in game coordinates and drawn and hit-tested at `scale` of them.
+    def __init__(self, x, y, width, height, text, color, hover_color, font,
+                 disabled_color=DARK_GRAY, bind=None, scale=1):
+        left, top = round(x * scale), round(y * scale)
+        self.rect = pygame.Rect(left, top, round((x + width) * scale) - left, round((y + height) * scale) - top)
+        self.radius = round(10 * scale)
+        self.border = max(1, round(3 * scale))
+        self.text = text
+        self.enabled = True
+        self.colors = (color, hover_color, disabled_color)
+        self.font = font
+        self.bind = bind
+        self.is_hovered = False
+        self.bounds = None
+        self.surfaces = {}
+
+    def set(self, text, enabled=True):
+        if text != self.text:
+            self.text = text
+            self.bounds = None
+            self.surfaces.clear()
+        self.enabled = enabled
+
+    def update(self):
+        if self.bind:
+            self.set(*self.bind())
+
+    @property
+    def state(self):
+        if not self.enabled:
+            return DISABLED
+        return HOVER if self.is_hovered else NORMAL
+
+    def get_bounds(self):
+        # Long labels can spill past the button rect
+        if self.bounds is None:
+            text_surf = render_text(self.font, self.text, True, WHITE)
+            self.bounds = self.rect.union(text_surf.get_rect(center=self.rect.center))
+        return self.bounds
+
+    def get_surface(self):
+        state = self.state
+        surface = self.surfaces.get(state)
+        if surface is None:
+            bounds = self.get_bounds()
+            surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
+            rect = self.rect.move(-bounds.x, -bounds.y)
+            pygame.draw.rect(surface, self.colors[state], rect, border_radius=self.radius)
+            pygame.draw.rect(surface, BLACK, rect, self.border, border_radius=self.radius)  # Border
+            text_surf = render_text(self.font, self.text, True, WHITE)
+            surface.blit(text_surf, text_surf.get_rect(center=rect.center))
+            self.surfaces[state] = surface
+        return surface
+
+    def draw(self, target):
+        return target.blit(self.get_surface(), self.get_bounds())
+
+    def check_hover(self, pos):
+        self.is_hovered = self.rect.collidepoint(pos)
+
+    def hit(self, pos):
+        return self.rect.collidepoint(pos)
+
+
+class Hotspot:
+    # A clickable area that draws nothing itself
+    def __init__(self, rect):
+        self.rect = pygame.Rect(rect)
+
+    def check_hover(self, pos):
+        pass
+
+    def hit(self, pos):
+        return self.rect.collidepoint(pos)
+
+
+def dispatch_click(targets, pos):
+    # Run the action of the first (widget, action) pair hit by pos
+    for widget, action in targets:
+        if widget.hit(pos):
+            action()
+            return True
+    return False